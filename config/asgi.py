@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# ASGI 서버는 하나의 이벤트 루프를 계속 사용하므로 Ollama AsyncClient 연결 풀을 프로세스에서 공유
+from news_api.chatbot import enable_shared_async_client  # noqa: E402
+
+enable_shared_async_client()
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/4.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -16,6 +17,80 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 OLLAMA_MODEL = 'gemma3:1b-it-qat' 
 
+# Ollama 공용 클라이언트 (연결 풀, 동시 생성 수, 타임아웃)
+OLLAMA_MAX_CONNECTIONS = 20
+OLLAMA_MAX_CONCURRENCY = 8          # 프로세스당 동시에 모델에 보내는 생성 요청 수 (동기/비동기 공통)
+OLLAMA_TIMEOUT_SECONDS = 120        # 응답 읽기 타임아웃 (스트리밍은 토큰 간 간격 기준)
+OLLAMA_CONNECT_TIMEOUT_SECONDS = 5
+OLLAMA_QUEUE_TIMEOUT_SECONDS = 30   # 생성 차례를 기다리는 최대 시간
+
+# 챗봇 RAG 검색 (질문 embedding ANN 검색 + BM25, RRF로 결합)
+RAG_TOP_K = 10          # 프롬프트에 넣을 기사 수
+RAG_CANDIDATES = 20     # 각 검색에서 가져올 후보 수
+RAG_USE_BM25 = True
+
+# 기사 요약 사전 생성 (summarize_articles 명령, 상세페이지 챗봇 프롬프트에 사용)
+DIGEST_MODEL = None              # None이면 OLLAMA_MODEL 사용
+DIGEST_BATCH_SIZE = 20
+DIGEST_INTERVAL_MINUTES = 5
+DIGEST_SOURCE_CHARS = 4000       # 요약에 사용할 본문 길이
+DIGEST_KEY_POINTS = 5
+DIGEST_RETRY_MINUTES = 60        # 실패한 기사를 다시 시도하기까지의 대기 시간
+DIGEST_MAX_FAILURES = 3          # 연속 실패 시 기사 내용이 바뀌기 전까지 재시도하지 않음
+
+# 챗봇 응답 캐시 (프로세스 내 LRU, 같은 프롬프트 또는 의미가 같은 질문의 답변 재사용)
+CHATBOT_CACHE_MAX_ENTRIES = 1000
+CHATBOT_CACHE_SECONDS = 3600
+CHATBOT_SEMANTIC_CACHE_MODES = []   # 질문 embedding 유사도로도 재사용할 모드 (예: ['none'], 빈 목록이면 사용 안 함)
+CHATBOT_SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# pgvector ANN 검색 설정 (값이 클수록 recall 증가, 속도 감소)
+PGVECTOR_HNSW_EF_SEARCH = 64
+PGVECTOR_IVFFLAT_PROBES = 10
+
+# Elasticsearch 인덱스 설정
+ES_INDEX_ALIAS = 'news_articles'   # 검색용 alias (실제 인덱스: news_articles_v{N})
+ES_INDEX_REPLICAS = 1              # 색인 완료 후 적용할 replica 수
+
+# 검색 결과를 Elasticsearch _source로 바로 응답 (False면 DB에서 조회 후 검색 순위로 정렬)
+SEARCH_SERVE_FROM_SOURCE = True
+
+# 하이브리드 검색 (BM25 + kNN, reciprocal rank fusion)
+HYBRID_SEARCH_WINDOW = 50           # 각 검색에서 가져올 후보 수
+HYBRID_SEARCH_NUM_CANDIDATES = 100  # kNN 샤드별 후보 수
+HYBRID_SEARCH_RRF_K = 60            # RRF 순위 상수
+
+# 자동완성 prefix 인덱스 (최근 기사 N개의 키워드/제목 단어로 구성, 주기적으로 재구성)
+AUTOCOMPLETE_SOURCE_ARTICLES = 5000
+AUTOCOMPLETE_REFRESH_SECONDS = 600
+AUTOCOMPLETE_BACKEND = 'elasticsearch'   # 'elasticsearch'(completion suggester) 또는 'trie'(prefix 인덱스만 사용)
+
+# 자동완성 completion suggester 인덱스 (전체 기사 기준, indexing 명령이 주기적으로 재구성)
+ES_SUGGEST_ALIAS = 'news_keyword_suggest'
+ES_SUGGEST_REFRESH_MINUTES = 60
+
+# 트렌딩 키워드 (최근 조회/좋아요/발행 기사의 keywords를 반감기 가중치로 집계)
+TRENDING_WINDOW_HOURS = 24
+TRENDING_HALF_LIFE_HOURS = 6
+TRENDING_SIZE = 20
+TRENDING_CACHE_SECONDS = 300
+TRENDING_AUTOCOMPLETE_BOOST = 20   # 1위 트렌딩 키워드가 자동완성 빈도에 더해지는 값
+
+# 질의 embedding 모델 (데이터 파이프라인이 기사 embedding에 사용한 모델과 같아야 함)
+EMBEDDING_BACKEND = 'sentence-transformers'  # 'sentence-transformers' 또는 'ollama'
+EMBEDDING_MODEL = 'jhgan/ko-sroberta-multitask'
+# 데이터 파이프라인이 NewsArticle.embedding 생성에 실제로 사용한 모델 이름
+# EMBEDDING_MODEL과 다르거나 지정하지 않으면 질의 벡터로 기사를 찾는 단계(하이브리드 검색 kNN, 챗봇 RAG ANN)를 건너뜀
+ARTICLE_EMBEDDING_MODEL = os.environ.get('ARTICLE_EMBEDDING_MODEL')
+
+# Elasticsearch bulk 색인 설정 (indexing 명령)
+ES_BULK_CHUNK_SIZE = 500   # bulk 요청당 문서 수
+ES_BULK_THREADS = 4        # bulk 워커 스레드 수
+
+# 유사 기사 사전 계산 설정
+SIMILAR_ARTICLES_TOP_K = 20            # 기사별로 저장할 이웃 수
+SIMILAR_ARTICLES_REFRESH_MINUTES = 5   # 새 기사 이웃 계산 주기
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
@@ -133,6 +208,62 @@ DATABASES = {
 #####------------------------------#####
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# 기사 수/대시보드/트렌딩/추천 캐시는 버전 키로 무효화하므로 모든 워커가 같은 캐시를 봐야 함
+# 여러 프로세스(gunicorn/uvicorn workers)로 운영할 때는 REDIS_URL을 설정해 Redis를 공유 캐시로 사용
+# (설정하지 않으면 프로세스별 LocMemCache → 단일 프로세스 배포에서만 무효화가 모든 요청에 반영됨)
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,  # 예: redis://localhost:6379/1
+            'KEY_PREFIX': 'ssafynews',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ssafynews',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,  # 초과 시 오래된 항목부터 제거
+            },
+        }
+    }
+
+# latest_news_id()(기사 수/추천 캐시 키에 사용) 캐시 시간(초)
+LATEST_NEWS_ID_CACHE_SECONDS = 10
+
+# news_page 카테고리별 총 개수 캐시 시간(초)
+NEWS_COUNT_CACHE_SECONDS = 300
+DASHBOARD_CACHE_SECONDS = 600   # 사용자 분석 대시보드 (조회/좋아요 시 무효화)
+
+# 기사 조회 기록 비동기 저장 (프로세스 내 큐 → 백그라운드 워커가 bulk_create)
+VIEW_EVENT_ASYNC = True
+VIEW_EVENT_QUEUE_SIZE = 10000
+VIEW_EVENT_BATCH_SIZE = 500
+VIEW_EVENT_FLUSH_SECONDS = 2
+VIEW_EVENT_MAX_RETRIES = 3  # 저장 실패 시 재시도 횟수 (재시도 간격은 VIEW_EVENT_RETRY_SECONDS부터 2배씩 증가)
+VIEW_EVENT_RETRY_SECONDS = 1
+
+# 인기도 점수 = 조회수 + 좋아요 * LIKE_WEIGHT + RECENCY_BONUS * 0.5^(경과시간 / HALF_LIFE)
+POPULARITY_LIKE_WEIGHT = 3
+POPULARITY_RECENCY_BONUS = 10
+POPULARITY_HALF_LIFE_HOURS = 72
+POPULARITY_SCORE_INTERVAL_MINUTES = 10
+
+# 사용자 취향 벡터 캐시 시간(초)
+TASTE_PROFILE_CACHE_SECONDS = 3600
+
+# 로그인 사용자 추천 순위 스냅샷 (상위 N개 ID를 짧게 캐시해 페이지 이동 시 재사용)
+RANKING_SNAPSHOT_SIZE = 240
+RANKING_SNAPSHOT_SECONDS = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
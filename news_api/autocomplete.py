@@ -0,0 +1,251 @@
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.db import connections
+from .models import NewsArticle
+from .search_indexes import KeywordSuggestion
+from .keywords import parse_keywords
+from .trending import get_trending_keywords
+
+
+# 기본 인기 키워드 목록 (자동완성 prefix 인덱스의 초기 후보)
+POPULAR_KEYWORDS = [
+    "AI", "인공지능", "머신러닝", "딥러닝", "ChatGPT", "OpenAI",
+    "경제", "주식", "부동산", "금리", "환율", "비트코인", "투자",
+    "정치", "대통령", "국회", "선거", "정책", "외교", "사과", "사회", "사건", "사람", "사업",
+    "기술", "IT", "스마트폰", "애플", "삼성", "구글", "메타", "가격", "가족", "가정",
+    "건강", "의료", "백신", "질병", "치료", "병원", "나라", "나이", "날씨",
+    "사회", "교육", "대학", "취업", "노동", "복지", "다음", "다른", "다양",
+    "스포츠", "축구", "야구", "올림픽", "월드컵", "라이프", "라이브", "라디오",
+    "문화", "영화", "드라마", "K-POP", "BTS", "예술", "마을", "마음", "마케팅",
+    "환경", "기후변화", "온실가스", "재생에너지", "친환경", "바다", "바이러스", "바로",
+    "자동차", "전기차", "테슬라", "현대", "기아", "서울", "서비스", "선택",
+    "게임", "e스포츠", "넷플릭스", "유튜브", "메타버스", "아이", "아시아", "안전"
+]
+
+
+def decompose_hangul(char):
+    """한글 문자를 자모로 분해"""
+    if not ('가' <= char <= '힣'):
+        return char
+    
+    code = ord(char) - ord('가')
+    jong = code % 28
+    jung = (code - jong) // 28 % 21
+    cho = (code - jong - jung * 28) // 21 // 28
+    
+    cho_list = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+    jung_list = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅘ', 'ㅙ', 'ㅚ', 'ㅛ', 'ㅜ', 'ㅝ', 'ㅞ', 'ㅟ', 'ㅠ', 'ㅡ', 'ㅢ', 'ㅣ']
+    jong_list = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+    
+    return cho_list[cho] + jung_list[jung] + jong_list[jong]
+
+def is_hangul_compatible(query, keyword):
+    """한글 자모 호환성 체크"""
+    if not query or not keyword:
+        return False
+    
+    # 영어나 숫자는 단순 포함 검사
+    if not any('가' <= c <= '힣' or 'ㄱ' <= c <= 'ㅣ' for c in query):
+        return query.lower() in keyword.lower()
+    
+    # 완성된 한글이 포함된 경우 단순 포함 검사
+    if all('가' <= c <= '힣' or c.isspace() or not ('ㄱ' <= c <= 'ㅣ') for c in query):
+        return query in keyword
+    
+    # 자모가 포함된 경우 세밀한 검사
+    query_jamo = ''.join(decompose_hangul(c) if '가' <= c <= '힣' else c for c in query)
+    keyword_jamo = ''.join(decompose_hangul(c) if '가' <= c <= '힣' else c for c in keyword)
+    
+    return query_jamo in keyword_jamo
+
+def matches_partial_hangul(query, target):
+    """부분 입력된 한글과 완성된 단어의 매칭 체크"""
+    if not query or not target:
+        return False
+    
+    # 쿼리의 마지막 문자가 자모인지 확인
+    last_char = query[-1]
+    if not ('ㄱ' <= last_char <= 'ㅣ'):
+        return is_hangul_compatible(query, target)
+    
+    # 마지막 자모를 제외한 부분
+    prefix = query[:-1]
+    
+    # 타겟에서 가능한 모든 위치를 확인
+    for i in range(len(target)):
+        # prefix가 매칭되는지 확인
+        if prefix and not target[i:].startswith(prefix):
+            continue
+            
+        # 마지막 자모가 다음 문자의 시작과 매칭되는지 확인
+        next_pos = i + len(prefix)
+        if next_pos < len(target):
+            next_char = target[next_pos]
+            if '가' <= next_char <= '힣':
+                next_jamo = decompose_hangul(next_char)
+                if next_jamo.startswith(last_char):
+                    return True
+            elif next_char == last_char:
+                return True
+    
+    return False
+
+
+def to_jamo(text):
+    """문자열 전체를 자모 단위로 분해 (영문은 소문자로 통일)"""
+    return ''.join(decompose_hangul(c) for c in text).lower()
+
+
+def clean_title_word(word):
+    """제목 단어에서 특수문자를 제거"""
+    return ''.join(c for c in word if c.isalnum())
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []  # 이 prefix로 시작하는 빈도 상위 단어들
+
+
+class PrefixIndex:
+    """
+    자모 단위 prefix 트리.
+    각 노드에 빈도순 상위 completion을 미리 저장해 조회가 O(prefix 길이)입니다.
+    """
+
+    def __init__(self, frequencies, top_k=10):
+        self.root = _Node()
+        self.size = len(frequencies)
+        # 빈도 내림차순으로 넣으면 각 노드의 top 목록은 앞에서부터 채워진 k개가 곧 상위 k개
+        for word, _ in sorted(frequencies.items(), key=lambda item: (-item[1], item[0])):
+            node = self.root
+            for ch in to_jamo(word):
+                node = node.children.setdefault(ch, _Node())
+                if len(node.top) < top_k:
+                    node.top.append(word)
+
+    def complete(self, query, limit=10):
+        """자모 분해한 query로 시작하는 단어를 빈도순으로 반환"""
+        node = self.root
+        for ch in to_jamo(query):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.top[:limit]
+
+
+def collect_keyword_frequencies(limit=0):
+    """
+    최근 기사들의 keywords와 제목 단어로 자동완성 후보 빈도를 계산
+    (limit 기본값은 AUTOCOMPLETE_SOURCE_ARTICLES, None이면 전체 기사)
+    """
+    frequencies = Counter()
+    # 기본 인기 키워드는 DB에 없어도 항상 후보에 포함
+    for keyword in POPULAR_KEYWORDS:
+        frequencies[keyword] += 3
+
+    if limit == 0:
+        limit = getattr(settings, 'AUTOCOMPLETE_SOURCE_ARTICLES', 5000)
+    rows = NewsArticle.objects.order_by('-updated').values_list('keyword_list', 'title')
+    rows = rows[:limit] if limit is not None else rows.iterator(chunk_size=2000)
+    for keyword_list, title in rows:
+        for keyword in parse_keywords(keyword_list):
+            frequencies[keyword] += 2
+        for word in (title or '').split():
+            word = clean_title_word(word)
+            if len(word) >= 2:
+                frequencies[word] += 1
+
+    # 현재 트렌딩 키워드는 순위에 비례한 가산점을 받아 자동완성 상위에 노출
+    try:
+        trending = get_trending_keywords()
+    except Exception as e:
+        print(f"Trending keywords error: {e}")
+        trending = []
+    boost = getattr(settings, 'TRENDING_AUTOCOMPLETE_BOOST', 20)
+    if trending and trending[0][1] > 0:
+        top_score = trending[0][1]
+        for keyword, score in trending:
+            frequencies[keyword] += round(boost * score / top_score)
+    return frequencies
+
+
+def suggestion_document(word, frequency):
+    """
+    자동완성 후보 단어의 completion 문서.
+    자모 분해형을 입력으로 색인하고 질의도 같은 방식으로 분해하므로
+    "ㅇㅣㄴ공", "인고" 같은 부분 입력도 prefix로 매칭됩니다.
+    """
+    return KeywordSuggestion(
+        meta={'id': word},
+        text=word,
+        suggest={'input': [to_jamo(word)], 'weight': frequency},
+    )
+
+
+def es_complete(query, limit=10):
+    """Elasticsearch completion suggester 한 번으로 자동완성 후보를 빈도순으로 조회"""
+    response = KeywordSuggestion.search().suggest(
+        'keywords', to_jamo(query),
+        completion={'field': 'suggest', 'size': limit, 'skip_duplicates': True},
+    ).source(['text']).execute()
+    return [option._source.text for option in response.suggest.keywords[0].options]
+
+
+def complete(query, limit=10):
+    """
+    AUTOCOMPLETE_BACKEND 설정에 따라 자동완성 후보를 조회합니다.
+    Elasticsearch 조회에 실패하면 프로세스 내 prefix 트리로 대체합니다.
+    """
+    if getattr(settings, 'AUTOCOMPLETE_BACKEND', 'elasticsearch') == 'elasticsearch':
+        try:
+            return es_complete(query, limit)
+        except Exception as e:
+            print(f"Autocomplete suggester error: {e}")
+    return get_prefix_index().complete(query, limit)
+
+
+_prefix_index = None
+_built_at = 0.0
+_refreshing = False
+_lock = threading.Lock()
+
+
+def _build():
+    global _prefix_index, _built_at
+    index = PrefixIndex(collect_keyword_frequencies())
+    _prefix_index, _built_at = index, time.time()
+    return index
+
+
+def _refresh_in_background():
+    global _refreshing
+    try:
+        index = _build()
+        print(f"🔤 자동완성 인덱스 갱신 완료: {index.size}개 단어")
+    except Exception as e:
+        print(f"Autocomplete index build error: {e}")
+    finally:
+        _refreshing = False
+        connections.close_all()  # 이 스레드의 DB 연결 정리
+
+
+def get_prefix_index():
+    """
+    자동완성 prefix 인덱스를 반환합니다.
+    최초 요청 시에만 동기적으로 만들고, 이후에는 주기적으로 백그라운드에서 갱신합니다.
+    """
+    global _refreshing
+    with _lock:
+        if _prefix_index is None:
+            return _build()
+
+        max_age = getattr(settings, 'AUTOCOMPLETE_REFRESH_SECONDS', 600)
+        if time.time() - _built_at > max_age and not _refreshing:
+            _refreshing = True
+            threading.Thread(target=_refresh_in_background, daemon=True).start()
+    return _prefix_index
@@ -0,0 +1,45 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from .models import NewsArticle
+
+
+def latest_news_id():
+    """
+    가장 최근에 추가된 기사 ID.
+    요청마다 MAX를 조회하지 않도록 LATEST_NEWS_ID_CACHE_SECONDS 동안 캐시합니다.
+    (그동안 새 기사가 들어와도 기사 수/추천 캐시 키는 최대 그 시간만큼 늦게 바뀜)
+    """
+    latest = cache.get('latest_news_id')
+    if latest is None:
+        latest = NewsArticle.objects.aggregate(latest=Max('news_id'))['latest'] or 0
+        cache.set('latest_news_id', latest, getattr(settings, 'LATEST_NEWS_ID_CACHE_SECONDS', 10))
+    return latest
+
+
+def cached_total_count(queryset, scope):
+    """
+    scope(카테고리 등)별 총 개수를 캐시합니다.
+    캐시 키에 최신 기사 ID가 포함되어 새 기사가 들어오면 자동으로 무효화됩니다.
+    """
+    key = f"news_total_count:{scope}:{latest_news_id()}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'NEWS_COUNT_CACHE_SECONDS', 300))
+    return count
+
+
+def dashboard_cache_key(user_id, day):
+    """
+    사용자 분석 대시보드(analyze_news) 캐시 키.
+    조회/좋아요가 생기면 버전이 바뀌고, 날짜가 바뀌면 최근 7일 구간이 달라지므로 키에 함께 포함합니다.
+    """
+    version = cache.get(f"dashboard_version:{user_id}", 0)
+    return f"dashboard:{user_id}:{version}:{day.isoformat()}"
+
+
+def invalidate_dashboard(user_id):
+    """사용자의 분석 대시보드 캐시를 무효화 (버전 키 교체)"""
+    cache.set(f"dashboard_version:{user_id}", time.time_ns(), None)
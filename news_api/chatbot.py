@@ -1,3 +1,8 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+import httpx
 import ollama
 import json
 import re
@@ -7,7 +12,14 @@ from datetime import datetime, timedelta
 from collections import Counter
 from .models import NewsArticle, Like, View, Comment
 from .serializers import NewsSerializer
-from pgvector.django import CosineDistance
+from .keywords import parse_keywords
+from .response_cache import response_cache
+from .digests import get_digest
+from .embeddings import embed_query
+from .vector_search import nearest_articles
+from .search import keyword_query, reciprocal_rank_fusion
+from .search_indexes import NewsArticleIndex
+from django.db.models.functions import Substr
 
 
 class NewsAnalyzer:
@@ -26,9 +38,7 @@ class NewsAnalyzer:
         # 키워드 분석
         all_keywords = []
         for article in articles:
-            if article.get('keywords'):
-                keywords = article['keywords'].replace('{', '').replace('}', '').replace('"', '')
-                all_keywords.extend([k.strip() for k in keywords.split(',') if k.strip()])
+            all_keywords.extend(parse_keywords(article.get('keyword_list') or article.get('keywords'), min_length=1))
         keyword_counts = Counter(all_keywords)
         
         # 날짜 분석
@@ -62,6 +72,119 @@ class NewsAnalyzer:
         return context_info
 
 
+SYSTEM_PROMPT = """당신은 뉴스 플랫폼의 AI 어시스턴트입니다. 
+                        친근하고 도움이 되는 톤으로 답변하며, 정확한 정보를 제공하는 것이 중요합니다.
+                        한국어로 자연스럽게 대화하세요."""
+
+
+def chat_messages(prompt):
+    """시스템 프롬프트와 사용자 프롬프트로 Ollama chat 메시지 목록 구성"""
+    return [
+        {'role': 'system', 'content': SYSTEM_PROMPT},
+        {'role': 'user', 'content': prompt},
+    ]
+
+
+def ollama_error_message(error):
+    """Ollama 오류를 사용자에게 보여줄 메시지로 변환"""
+    # Ollama 연결 오류인지 확인
+    if "connection" in str(error).lower() or "refused" in str(error).lower():
+        return "AI 서비스에 연결할 수 없습니다. 잠시 후 다시 시도해 주세요."
+    return "응답 생성 중 오류가 발생했습니다. 다시 시도해 주세요."
+
+
+def _ollama_client_options():
+    """Ollama 클라이언트 공통 설정 (연결 풀 크기, 타임아웃)"""
+    max_connections = getattr(settings, 'OLLAMA_MAX_CONNECTIONS', 20)
+    return {
+        'host': getattr(settings, 'OLLAMA_HOST', 'http://gemma3-ollama:11434'),
+        'timeout': httpx.Timeout(
+            getattr(settings, 'OLLAMA_TIMEOUT_SECONDS', 120),
+            connect=getattr(settings, 'OLLAMA_CONNECT_TIMEOUT_SECONDS', 5),
+        ),
+        'limits': httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    }
+
+
+_client = None
+
+
+def get_ollama_client():
+    """프로세스 공용 Ollama 동기 클라이언트 (keep-alive 연결 재사용)"""
+    global _client
+    if _client is None:
+        _client = ollama.Client(**_ollama_client_options())
+    return _client
+
+
+class ChatbotBusyError(Exception):
+    """동시 생성 수 제한으로 대기 시간 안에 차례가 오지 않은 경우"""
+
+
+# 프로세스 전체에서 모델 서버로 동시에 보내는 생성 요청 수 제한 (동기/비동기/스트리밍 공통)
+_generation_slots = threading.BoundedSemaphore(getattr(settings, 'OLLAMA_MAX_CONCURRENCY', 8))
+GENERATION_SLOT_POLL_SECONDS = 0.05  # 비동기 대기 시 슬롯 획득 재시도 간격
+
+
+def acquire_generation_slot():
+    """생성 슬롯을 기다립니다. OLLAMA_QUEUE_TIMEOUT_SECONDS를 넘기면 ChatbotBusyError"""
+    if not _generation_slots.acquire(timeout=getattr(settings, 'OLLAMA_QUEUE_TIMEOUT_SECONDS', 30)):
+        raise ChatbotBusyError("AI 서비스 요청이 많습니다. 잠시 후 다시 시도해 주세요.")
+
+
+def release_generation_slot():
+    _generation_slots.release()
+
+
+async def aacquire_generation_slot():
+    """
+    이벤트 루프를 막지 않고 생성 슬롯을 기다립니다. OLLAMA_QUEUE_TIMEOUT_SECONDS를 넘기면 ChatbotBusyError
+    스레드에서 블로킹으로 기다리지 않고 논블로킹 획득을 주기적으로 시도하므로, 대기 중에 요청이 취소돼도
+    (클라이언트 연결 종료 등) 슬롯을 잡은 채로 남는 경우가 없습니다.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + getattr(settings, 'OLLAMA_QUEUE_TIMEOUT_SECONDS', 30)
+    while not _generation_slots.acquire(blocking=False):
+        if loop.time() >= deadline:
+            raise ChatbotBusyError("AI 서비스 요청이 많습니다. 잠시 후 다시 시도해 주세요.")
+        await asyncio.sleep(GENERATION_SLOT_POLL_SECONDS)
+
+
+# AsyncClient(httpx)는 생성된 이벤트 루프에 묶이므로, ASGI 서버처럼 하나의 루프가 계속 도는
+# 경우에만 공용 client를 둡니다. (config/asgi.py에서 enable_shared_async_client 호출)
+_shared_async_enabled = False
+_shared_async_client = None
+_shared_async_loop = None
+
+
+def enable_shared_async_client():
+    global _shared_async_enabled
+    _shared_async_enabled = True
+
+
+@asynccontextmanager
+async def async_ollama_client():
+    """
+    Ollama AsyncClient를 빌려줍니다.
+    ASGI 서버의 이벤트 루프에서는 프로세스 공용 client(연결 풀 재사용)를, 그 밖의 루프
+    (WSGI에서 요청마다 만들어지는 루프 등)에서는 요청 동안만 쓰고 닫는 client를 사용합니다.
+    """
+    global _shared_async_client, _shared_async_loop
+    loop = asyncio.get_running_loop()
+    if _shared_async_enabled and (_shared_async_client is None or _shared_async_loop is loop):
+        if _shared_async_client is None:
+            _shared_async_client = ollama.AsyncClient(**_ollama_client_options())
+            _shared_async_loop = loop
+        yield _shared_async_client
+        return
+
+    client = ollama.AsyncClient(**_ollama_client_options())
+    try:
+        yield client
+    finally:
+        await client._client.aclose()
+
+
 class ChatbotService:
     """뉴스 챗봇 서비스 클래스"""
     
@@ -69,22 +192,39 @@ class ChatbotService:
         self.user = user
         self.mode = mode  # 'none', 'now', 'all'
         self.analyzer = NewsAnalyzer()
+        # 응답 캐시 키로 프롬프트 대신 쓸 문자열 (사용자/조회수처럼 답에 영향이 적은 값을 제외할 때)
+        self.cache_text = None
     
+    def build_prompt(self, message, context=None):
+        """모드별 처리로 LLM에 보낼 프롬프트 생성 (지원하지 않는 모드는 None)"""
+        if self.mode == 'none':
+            return self._handle_none_mode(message)
+        elif self.mode == 'now':
+            return self._handle_now_mode(message, context)
+        elif self.mode == 'all':
+            return self._handle_all_mode(message, context)
+        return None
+
     def process_message(self, message, context=None):
         """메시지 처리 및 응답 생성"""
         try:
-            # 모드별 처리
-            if self.mode == 'none':
-                return self._handle_none_mode(message)
-            elif self.mode == 'now':
-                return self._handle_now_mode(message, context)
-            elif self.mode == 'all':
-                return self._handle_all_mode(message, context)
-            else:
+            prompt = self.build_prompt(message, context)
+            if prompt is None:
                 return {
                     "response": "지원하지 않는 모드입니다.",
                     "error": True
                 }
+
+            # 같은 (모드, 프롬프트) 또는 의미가 같은 질문의 응답은 재사용
+            cache_text = self.cache_text or prompt
+            cached = response_cache.get(self.mode, cache_text, message)
+            if cached is not None:
+                return {"response": cached, "error": False}
+
+            result = self._generate_ollama_response(prompt)
+            if not result['error']:
+                response_cache.set(self.mode, cache_text, result['response'], message)
+            return result
                 
         except Exception as e:
             print(f"Chatbot Service Error: {e}")
@@ -103,7 +243,7 @@ class ChatbotService:
         일상적인 대화도 자연스럽게 응답해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_now_mode(self, message, context):
         """현재 페이지 정보 활용 모드"""
@@ -145,7 +285,7 @@ class ChatbotService:
             기사의 내용을 인용할 때는 어떤 기사에서 나온 정보인지 명시해주세요.
             """
             
-            return self._generate_ollama_response(prompt)
+            return prompt
             
         except Exception as e:
             print(f"RAG mode error: {e}")
@@ -261,7 +401,7 @@ class ChatbotService:
             어떤 주제나 키워드로 검색하고 싶은지 다시 물어보세요.
             """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_recommendation_request(self, message, context_info, user_profile):
         """추천 요청 처리"""
@@ -289,7 +429,7 @@ class ChatbotService:
             현재 인기 있는 뉴스나 중요한 이슈를 중심으로 추천해주세요.
             """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_analysis_request(self, message, context_info, user_profile):
         """분석 요청 처리"""
@@ -305,7 +445,7 @@ class ChatbotService:
         통계나 트렌드가 있다면 구체적으로 설명해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_article_question(self, message, context_info):
         """기사 관련 질문 처리"""
@@ -318,7 +458,7 @@ class ChatbotService:
         기사의 내용을 바탕으로 정확하고 도움이 되는 답변을 해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_general_question(self, message, context_info, user_profile):
         """일반 질문 처리"""
@@ -332,7 +472,7 @@ class ChatbotService:
         뉴스 플랫폼의 AI 어시스턴트로서 친근하고 도움이 되는 답변을 해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _extract_search_terms(self, message):
         """메시지에서 검색어 추출"""
@@ -415,7 +555,7 @@ class ChatbotService:
         홈페이지에 표시된 뉴스들을 바탕으로 도움이 되는 답변을 해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_search_page_query(self, message, context_info, user_profile):
         """검색페이지 관련 질의 처리"""
@@ -436,16 +576,36 @@ class ChatbotService:
         검색 결과를 바탕으로 사용자의 질문에 답변해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_detail_page_query(self, message, context_info, user_profile):
         """상세페이지 관련 질의 처리"""
         article = context_info.get('article', {})
         similar_articles = context_info.get('similar_articles', [])
         comments = context_info.get('comments', [])
-        
-        # 기사 내용을 더 상세히 포함
-        article_content = article.get('content', article.get('summary', ''))
+        comments_summary = self._format_comments_summary(comments) if comments else "댓글이 없습니다."
+        
+        # 같은 기사에 대한 같은 질문(요약 등)은 조회수/좋아요 수와 관계없이 응답 재사용
+        # 단, 사용자 선호도가 들어간 답변은 그 사용자에게만, 댓글이 바뀌면 새로 생성
+        article_key = article.get('id') or article.get('news_id') or article.get('title')
+        if article_key:
+            user_key = self.user.pk if user_profile else ''
+            self.cache_text = f"detail|{article_key}|{user_key}|{len(comments)}|{comments_summary}|{message}"
+
+        # 미리 생성한 요약이 있으면 본문 대신 요약/핵심 포인트만 전달 (프롬프트 단축)
+        digest = get_digest(article.get('id') or article.get('news_id'))
+        if digest:
+            key_points = '\n'.join(f"- {point}" for point in digest.key_points)
+            article_body = f"""핵심 요약:
+        {digest.summary}
+
+        핵심 포인트:
+        {key_points}"""
+        else:
+            # 기사 내용을 더 상세히 포함
+            article_content = article.get('content', article.get('summary', ''))
+            article_body = f"""기사 전체 내용:
+        {article_content[:1000]}{'...(더 많은 내용 있음)' if len(article_content) > 1000 else ''}"""
         
         prompt = f"""
         사용자가 뉴스 상세페이지에서 질문했습니다: {message}
@@ -456,8 +616,7 @@ class ChatbotService:
         작성자: {article.get('author', '')}
         내용 요약: {article.get('summary', '')}
         
-        기사 전체 내용:
-        {article_content[:1000]}{'...(더 많은 내용 있음)' if len(article_content) > 1000 else ''}
+        {article_body}
         
         키워드: {article.get('keywords', '')}
         좋아요 수: {article.get('like_count', 0)}
@@ -467,7 +626,7 @@ class ChatbotService:
         {self._format_articles_summary(similar_articles)}
         
         댓글 ({len(comments)}개):
-        {self._format_comments_summary(comments) if comments else "댓글이 없습니다."}
+        {comments_summary}
         
         {f"사용자 선호도: {user_profile}" if user_profile else ""}
         
@@ -476,7 +635,7 @@ class ChatbotService:
         관련 질문이면 기사 내용을 참조하여 답변해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _handle_general_page_query(self, message, context_info, user_profile):
         """일반 페이지 질의 처리"""
@@ -490,65 +649,88 @@ class ChatbotService:
         뉴스 플랫폼의 AI 어시스턴트로서 친근하고 도움이 되는 답변을 해주세요.
         """
         
-        return self._generate_ollama_response(prompt)
+        return prompt
     
     def _rag_search(self, query):
-        """RAG 시스템을 사용한 관련 기사 검색"""
+        """
+        RAG 시스템을 사용한 관련 기사 검색.
+        질문 embedding으로 ANN 검색(HNSW 인덱스)을 하고, RAG_USE_BM25가 켜져 있으면
+        Elasticsearch BM25 결과와 reciprocal rank fusion으로 합쳐 상위 RAG_TOP_K개를 반환합니다.
+        한 단계가 실패해도 나머지 단계에서 얻은 결과로 순위를 매겨 반환합니다.
+        """
+        size = getattr(settings, 'RAG_TOP_K', 10)
+        window = max(size, getattr(settings, 'RAG_CANDIDATES', 20))
+        timings = {}
+        stage_started = time.perf_counter()
+
+        def lap(stage):
+            nonlocal stage_started
+            now = time.perf_counter()
+            timings[stage] = (now - stage_started) * 1000
+            stage_started = now
+
+        # 프롬프트에 필요한 컬럼과 본문 앞 500자만 DB에서 가져옴
+        fields = NewsArticle.objects.only(
+            'news_id', 'title', 'summary', 'category', 'updated', 'author', 'keywords'
+        ).annotate(content=Substr('full_text', 1, 500))
+
+        # 1. 질문 embedding (기사 embedding 모델과 다르면 건너뜀)
         try:
-            # 1. 키워드 기반 1차 검색
-            keywords = self._extract_search_terms(query)
-            
-            # 2. 데이터베이스에서 관련 기사 검색
-            articles = NewsArticle.objects.filter(
-                title__icontains=' '.join(keywords)
-            )[:10]
-            
-            if not articles:
-                # 키워드로 찾지 못하면 카테고리나 요약으로 확장 검색
-                articles = NewsArticle.objects.filter(
-                    summary__icontains=' '.join(keywords)
-                )[:10]
-            
-            # 3. 벡터 기반 검색 (embedding이 있는 경우)
-            if articles.exists() and articles.first().embedding is not None:
-                # 첫 번째 기사의 embedding을 기준으로 유사 기사 추가 검색
-                first_article = articles.first()
-                similar_articles = NewsArticle.objects.exclude(
-                    pk=first_article.pk
-                ).annotate(
-                    similarity=CosineDistance("embedding", first_article.embedding)
-                ).order_by("similarity")[:5]
-                
-                # 결과 합치기
-                all_articles = list(articles) + list(similar_articles)
-                # 중복 제거
-                seen_ids = set()
-                unique_articles = []
-                for article in all_articles:
-                    if article.pk not in seen_ids:
-                        unique_articles.append(article)
-                        seen_ids.add(article.pk)
-                        if len(unique_articles) >= 10:
-                            break
-                
-                articles = unique_articles
-            
-            return [
-                {
-                    'title': article.title,
-                    'summary': article.summary,
-                    'category': article.category,
-                    'content': getattr(article, 'content', '')[:500] + '...' if hasattr(article, 'content') else '',
-                    'updated': article.updated,
-                    'author': getattr(article, 'author', ''),
-                    'keywords': article.keywords
-                }
-                for article in articles
-            ]
-            
+            query_vector = embed_query(query)
         except Exception as e:
-            print(f"RAG search error: {e}")
-            return []
+            print(f"RAG embedding error: {e}")
+            query_vector = None
+        lap('embed')
+
+        # 2. ANN 검색 (기사 데이터까지 한 번에 조회)
+        articles = {}
+        ann_ids = []
+        if query_vector is not None:
+            try:
+                for article in nearest_articles(query_vector, window, queryset=fields):
+                    articles[article.news_id] = article
+                    ann_ids.append(article.news_id)
+            except Exception as e:
+                print(f"RAG ANN error: {e}")
+        lap('ann')
+
+        # 3. BM25 검색 (ID만 조회)
+        bm25_ids = []
+        if getattr(settings, 'RAG_USE_BM25', True):
+            try:
+                response = NewsArticleIndex.search().query(keyword_query(query)).source(False)[:window].execute()
+                bm25_ids = [int(hit.meta.id) for hit in response]
+            except Exception as e:
+                print(f"RAG BM25 error: {e}")
+        lap('bm25')
+
+        # 4. 순위 결합 후 ANN 결과에 없던 기사만 추가 조회 (실패하면 이미 가져온 기사만 사용)
+        ranked_ids = reciprocal_rank_fusion(
+            ann_ids, bm25_ids, k=getattr(settings, 'HYBRID_SEARCH_RRF_K', 60)
+        )
+        missing_ids = [news_id for news_id in ranked_ids[:size] if news_id not in articles]
+        if missing_ids:
+            try:
+                articles.update(fields.in_bulk(missing_ids))
+            except Exception as e:
+                print(f"RAG fetch error: {e}")
+        lap('fetch')
+
+        print("RAG search timings: " + ", ".join(f"{stage}={ms:.1f}ms" for stage, ms in timings.items())
+              + f" (ann={len(ann_ids)}, bm25={len(bm25_ids)})")
+
+        return [
+            {
+                'title': article.title,
+                'summary': article.summary,
+                'category': article.category,
+                'content': article.content + '...' if article.content else '',
+                'updated': article.updated,
+                'author': article.author,
+                'keywords': article.keywords
+            }
+            for article in (articles[news_id] for news_id in ranked_ids if news_id in articles)
+        ][:size]
     
     def _format_rag_results(self, articles):
         """RAG 검색 결과 포맷팅"""
@@ -596,23 +778,14 @@ class ChatbotService:
     def _generate_ollama_response(self, prompt):
         """Ollama를 사용한 응답 생성"""
         try:
-            # Ollama 클라이언트 설정
-            client = ollama.Client(host=getattr(settings, 'OLLAMA_HOST', 'http://gemma3-ollama:11434'))
-            
-            response = client.chat(
+            acquire_generation_slot()
+        except ChatbotBusyError as e:
+            return {"response": str(e), "error": True}
+
+        try:
+            response = get_ollama_client().chat(
                 model=getattr(settings, 'OLLAMA_MODEL', 'gemma3:1b-it-qat'),
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': """당신은 뉴스 플랫폼의 AI 어시스턴트입니다. 
-                        친근하고 도움이 되는 톤으로 답변하며, 정확한 정보를 제공하는 것이 중요합니다.
-                        한국어로 자연스럽게 대화하세요."""
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ]
+                messages=chat_messages(prompt)
             )
             
             return {
@@ -622,17 +795,38 @@ class ChatbotService:
             
         except Exception as e:
             print(f"Ollama Error: {e}")
-            # Ollama 연결 오류인지 확인
-            if "connection" in str(e).lower() or "refused" in str(e).lower():
-                return {
-                    "response": "AI 서비스에 연결할 수 없습니다. 잠시 후 다시 시도해 주세요.",
-                    "error": True
-                }
-            else:
-                return {
-                    "response": "응답 생성 중 오류가 발생했습니다. 다시 시도해 주세요.",
-                    "error": True
-                }
+            return {
+                "response": ollama_error_message(e),
+                "error": True
+            }
+        finally:
+            release_generation_slot()
+
+
+
+class AsyncChatbotService(ChatbotService):
+    """
+    ASGI 환경용 챗봇 서비스.
+    ASGI 서버에서는 프로세스 공용 AsyncClient의 연결 풀을 재사용하고, 프로세스 전체 생성 슬롯으로
+    모델 서버에 대한 동시 생성 수를 제한합니다. (차례를 기다리는 동안 이벤트 루프는 다른 요청을 처리)
+    """
+
+    async def stream_ollama_response(self, prompt):
+        """Ollama 스트리밍 응답을 토큰 단위로 전달하는 async generator"""
+        await aacquire_generation_slot()
+        try:
+            async with async_ollama_client() as client:
+                stream = await client.chat(
+                    model=getattr(settings, 'OLLAMA_MODEL', 'gemma3:1b-it-qat'),
+                    messages=chat_messages(prompt),
+                    stream=True,
+                )
+                async for part in stream:
+                    token = part['message']['content']
+                    if token:
+                        yield token
+        finally:
+            release_generation_slot()
 
 
 # 편의 함수들
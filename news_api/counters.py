@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Count, OuterRef, Subquery, IntegerField
+from django.db.models.functions import Coalesce, Greatest
+from .models import NewsArticle, View, Like, Comment
+
+
+def increment_counter(news_id, field, delta=1):
+    """기사의 카운터 컬럼(view_count, like_count, comment_count)을 원자적으로 증감"""
+    NewsArticle.objects.filter(news_id=news_id).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+def _count_subquery(model):
+    """기사별 상호작용 개수를 세는 상관 서브쿼리"""
+    counts = model.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news').annotate(c=Count('*')).values('c')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def reconcile_counters(queryset=None):
+    """View, Like, Comment 테이블을 기준으로 카운터 컬럼을 다시 계산합니다."""
+    if queryset is None:
+        queryset = NewsArticle.objects.all()
+    return queryset.update(
+        view_count=_count_subquery(View),
+        like_count=_count_subquery(Like),
+        comment_count=_count_subquery(Comment),
+    )
+
+
+# 경과 시간에 따라 최신성 보너스가 반감기 단위로 줄어드는 인기도 점수를 news_api_articlepopularity에 저장
+# 소수점 2자리로 반올림해 값(또는 카테고리)이 바뀐 행만 갱신 (오래된 기사는 점수가 고정됨)
+POPULARITY_SQL = """
+    INSERT INTO news_api_articlepopularity AS p (article_id, category, score)
+    SELECT news_id, category,
+           round((
+               view_count + like_count * %s
+               + %s * power(0.5, GREATEST(EXTRACT(EPOCH FROM (now() - updated)), 0) / 3600.0 / %s)
+           )::numeric, 2)::float8
+    FROM news_api_newsarticle
+    ON CONFLICT (article_id) DO UPDATE
+        SET score = EXCLUDED.score, category = EXCLUDED.category
+        WHERE (p.score, p.category) IS DISTINCT FROM (EXCLUDED.score, EXCLUDED.category)
+"""
+
+
+def update_popularity_scores():
+    """모든 기사의 인기도 점수(ArticlePopularity)를 다시 계산하고 추가/갱신된 행 수를 반환합니다."""
+    with connection.cursor() as cursor:
+        cursor.execute(POPULARITY_SQL, [
+            getattr(settings, 'POPULARITY_LIKE_WEIGHT', 3),
+            getattr(settings, 'POPULARITY_RECENCY_BONUS', 10),
+            getattr(settings, 'POPULARITY_HALF_LIFE_HOURS', 72),
+        ])
+        return cursor.rowcount
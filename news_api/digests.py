@@ -0,0 +1,104 @@
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import NewsArticle, ArticleDigest
+
+DIGEST_PROMPT = """다음 뉴스 기사를 읽고 JSON으로만 답하세요.
+형식: {{"summary": "3문장 이내 핵심 요약", "key_points": ["핵심 포인트", ...]}}
+key_points는 최대 {max_points}개의 짧은 문장으로 작성하세요.
+
+제목: {title}
+요약: {summary}
+본문:
+{body}
+"""
+
+
+def pending_articles(limit):
+    """
+    요약이 없거나 요약 이후 내용이 바뀐 기사 (최신 기사 우선)
+    본문(full_text)이 아직 수집되지 않은 기사는 제목만으로 요약하지 않도록 본문이 채워질 때까지 건너뜁니다.
+    최근 DIGEST_RETRY_MINUTES 안에 실패한 기사는 건너뛰고, DIGEST_MAX_FAILURES번 연속 실패한 기사는
+    그 뒤 기사 내용이 바뀌기 전까지 다시 시도하지 않아 실패하는 기사가 배치를 차지하지 않도록 합니다.
+    """
+    retry_after = timezone.now() - timedelta(minutes=getattr(settings, 'DIGEST_RETRY_MINUTES', 60))
+    return NewsArticle.objects.filter(
+        Q(digest__isnull=True)
+        | Q(digest__source_updated__isnull=True)
+        | Q(digest__source_updated__lt=F('updated'))
+    ).exclude(
+        full_text=''
+    ).exclude(
+        digest__failed_at__gt=retry_after
+    ).exclude(
+        digest__failures__gte=getattr(settings, 'DIGEST_MAX_FAILURES', 3),
+        digest__failed_at__gte=F('updated'),
+    ).only('news_id', 'title', 'summary', 'full_text', 'updated').order_by('-news_id')[:limit]
+
+
+def parse_digest(content, max_points):
+    """모델 응답(JSON)을 (요약, 핵심 포인트 목록)으로 변환 (JSON이 아니면 전체를 요약으로 사용)"""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content.strip(), []
+    if not isinstance(data, dict):
+        return content.strip(), []
+    key_points = data.get('key_points') or []
+    if not isinstance(key_points, list):
+        key_points = [key_points]
+    return str(data.get('summary', '')).strip(), [str(point).strip() for point in key_points if point][:max_points]
+
+
+def generate_digest(article):
+    """기사 하나의 요약/핵심 포인트를 생성해 저장합니다."""
+    from .chatbot import get_ollama_client
+
+    model = getattr(settings, 'DIGEST_MODEL', None) or getattr(settings, 'OLLAMA_MODEL', 'gemma3:1b-it-qat')
+    max_points = getattr(settings, 'DIGEST_KEY_POINTS', 5)
+    body = (article.full_text or '')[:getattr(settings, 'DIGEST_SOURCE_CHARS', 4000)]
+
+    response = get_ollama_client().chat(
+        model=model,
+        messages=[{'role': 'user', 'content': DIGEST_PROMPT.format(
+            max_points=max_points, title=article.title, summary=article.summary or '', body=body,
+        )}],
+        format='json',
+    )
+    summary, key_points = parse_digest(response['message']['content'], max_points)
+    if not summary:
+        raise ValueError("empty summary")
+
+    digest, _ = ArticleDigest.objects.update_or_create(
+        article_id=article.news_id,
+        defaults={
+            'summary': summary,
+            'key_points': key_points,
+            'model': model,
+            'source_updated': article.updated,
+            'failures': 0,
+            'failed_at': None,
+        }
+    )
+    return digest
+
+
+def record_digest_failure(article):
+    """요약 생성 실패를 기록합니다. (이전에 만든 요약이 있으면 그대로 유지)"""
+    now = timezone.now()
+    updated = ArticleDigest.objects.filter(article_id=article.news_id).update(
+        failures=F('failures') + 1, failed_at=now,
+    )
+    if not updated:
+        ArticleDigest.objects.create(article_id=article.news_id, failures=1, failed_at=now)
+
+
+def get_digest(news_id):
+    """기사의 미리 생성된 요약 (없으면 None)"""
+    if not news_id:
+        return None
+    return ArticleDigest.objects.filter(
+        article_id=news_id, source_updated__isnull=False
+    ).only('summary', 'key_points').first()
@@ -0,0 +1,56 @@
+from functools import lru_cache
+from django.conf import settings
+
+
+@lru_cache(maxsize=1)
+def _load_sentence_transformer():
+    """sentence-transformers 모델 로드 (프로세스당 한 번)"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(getattr(settings, 'EMBEDDING_MODEL', 'jhgan/ko-sroberta-multitask'))
+
+
+@lru_cache(maxsize=1024)
+def _embed(text):
+    backend = getattr(settings, 'EMBEDDING_BACKEND', 'sentence-transformers')
+    if backend == 'ollama':
+        from .chatbot import get_ollama_client
+        response = get_ollama_client().embeddings(model=getattr(settings, 'EMBEDDING_MODEL'), prompt=text)
+        return tuple(response['embedding'])
+
+    vector = _load_sentence_transformer().encode(text)
+    return tuple(float(v) for v in vector)
+
+
+def embed_text(text):
+    """
+    문장을 EMBEDDING_MODEL로 벡터화합니다.
+    같은 문장은 프로세스 내 LRU 캐시에서 재사용합니다.
+    """
+    return list(_embed(' '.join(text.split())))
+
+
+class EmbeddingModelMismatch(Exception):
+    """질의 embedding 모델이 기사 embedding 모델과 달라 벡터를 비교할 수 없을 때 발생"""
+    pass
+
+
+def embed_query(text):
+    """
+    기사 embedding(NewsArticle.embedding)과 비교할 질의 벡터를 만듭니다.
+    EMBEDDING_MODEL이 ARTICLE_EMBEDDING_MODEL(파이프라인이 사용한 모델)과 다르거나
+    벡터 차원이 맞지 않으면 EmbeddingModelMismatch를 발생시킵니다.
+    """
+    from .models import NewsArticle
+
+    article_model = getattr(settings, 'ARTICLE_EMBEDDING_MODEL', None)
+    query_model = getattr(settings, 'EMBEDDING_MODEL', 'jhgan/ko-sroberta-multitask')
+    if article_model != query_model:
+        raise EmbeddingModelMismatch(
+            f"EMBEDDING_MODEL({query_model})이 기사 embedding 모델({article_model or '미지정'})과 다릅니다."
+        )
+
+    vector = embed_text(text)
+    dimensions = NewsArticle._meta.get_field('embedding').dimensions
+    if len(vector) != dimensions:
+        raise EmbeddingModelMismatch(f"질의 벡터 차원({len(vector)})이 기사 embedding 차원({dimensions})과 다릅니다.")
+    return vector
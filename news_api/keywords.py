@@ -0,0 +1,38 @@
+from django.db import connection
+
+
+def parse_keywords(raw, min_length=2):
+    """
+    기사 키워드를 목록으로 변환합니다.
+    keyword_list 배열은 그대로, keywords 문자열('{"AI","반도체"}' 형태)은 파싱해서 사용하며
+    min_length보다 짧은 키워드는 제외합니다.
+    """
+    if not raw:
+        return []
+    if isinstance(raw, str):
+        raw = raw.replace('{', '').replace('}', '').replace('"', '').split(',')
+    keywords = (keyword.strip() for keyword in raw)
+    return [keyword for keyword in keywords if len(keyword) >= min_length]
+
+
+# news_id 서브쿼리에 속한 기사들의 keyword_list를 펼쳐 키워드별 개수를 집계
+TOP_KEYWORDS_SQL = """
+    SELECT keyword, COUNT(*) AS count
+    FROM news_api_newsarticle AS a
+    CROSS JOIN LATERAL unnest(a.keyword_list) AS keyword
+    WHERE a.news_id IN ({subquery})
+    GROUP BY keyword
+    ORDER BY count DESC, keyword
+    LIMIT %s
+"""
+
+
+def top_keywords(news_ids, limit=10):
+    """
+    news_ids(news_id 값을 반환하는 queryset)의 기사 키워드를 DB에서 집계해
+    많이 등장한 순으로 (키워드, 개수) 목록을 반환합니다.
+    """
+    subquery, params = news_ids.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(TOP_KEYWORDS_SQL.format(subquery=subquery), [*params, limit])
+        return cursor.fetchall()
@@ -3,6 +3,7 @@ import django
 import time
 import schedule
 from datetime import datetime, timedelta
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
 # Django 설정 로드 (manage.py가 있는 디렉토리 기준으로 설정)
@@ -10,15 +11,28 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 from elasticsearch import Elasticsearch
-from news_api.models import NewsArticle
+from elasticsearch.helpers import bulk, parallel_bulk
+from news_api.models import NewsArticle, ArticleOutbox, SyncCheckpoint
 from news_api.search_indexes import NewsArticleIndex
+from news_api.autocomplete import collect_keyword_frequencies, suggestion_document
 
 es = Elasticsearch("http://elasticsearch:9200")
-INDEX_NAME = "news_articles"
+# 검색은 항상 alias로 하고, 실제 데이터는 버전별 인덱스(news_articles_v{N})에 저장
+INDEX_ALIAS = getattr(settings, 'ES_INDEX_ALIAS', 'news_articles')
 
-def create_initial_index():
-    """Elasticsearch 인덱스를 생성합니다."""
-    settings = {
+# 색인 문서 생성에 필요한 필드만 조회 (full_text 제외)
+INDEX_FIELDS = ('news_id', 'title', 'summary', 'category', 'updated', 'author', 'link', 'embedding')
+
+# 자동완성 후보 단어 인덱스 alias (실제 인덱스: news_keyword_suggest_v{N})
+SUGGEST_ALIAS = getattr(settings, 'ES_SUGGEST_ALIAS', 'news_keyword_suggest')
+
+# SyncCheckpoint에 저장되는 색인 작업 이름과 한 번에 처리할 outbox 행 수
+CHECKPOINT_NAME = 'elasticsearch'
+OUTBOX_BATCH_SIZE = 5000
+
+def index_body():
+    """뉴스 인덱스의 settings/mappings 정의"""
+    return {
         "settings": {
             "analysis": {
                 "tokenizer": {
@@ -38,84 +52,288 @@ def create_initial_index():
             }
         },
         "mappings": {
+            # embedding은 kNN 검색에만 쓰이므로 _source에 저장하지 않음
+            "_source": {"excludes": ["embedding"]},
             "properties": {
+                "news_id": {"type": "integer"},
                 "title": {"type": "text", "analyzer": "edge_ngram_analyzer"},
                 "summary": {"type": "text", "analyzer": "edge_ngram_analyzer"},
                 "category": {"type": "keyword"},
-                "updated": {"type": "date"}
+                "updated": {"type": "date"},
+                "author": {"type": "keyword"},
+                "link": {"type": "keyword", "index": False},
+                "embedding": {"type": "dense_vector", "dims": 768, "index": True, "similarity": "cosine"}
+            }
+        }
+    }
+
+def suggest_index_body():
+    """자동완성 후보 인덱스의 settings/mappings 정의"""
+    return {
+        "settings": {
+            "analysis": {
+                "analyzer": {
+                    # 자모 분해된 입력 전체를 하나의 토큰으로 prefix 매칭
+                    "suggest_analyzer": {
+                        "type": "custom",
+                        "tokenizer": "keyword",
+                        "filter": ["lowercase"]
+                    }
+                }
+            }
+        },
+        "mappings": {
+            "properties": {
+                "text": {"type": "keyword", "index": False},
+                "suggest": {"type": "completion", "analyzer": "suggest_analyzer", "preserve_separators": True}
             }
         }
     }
 
-    if es.indices.exists(index=INDEX_NAME):
-        print(f"🔄 기존 인덱스 '{INDEX_NAME}' 삭제 중...")
-        es.indices.delete(index=INDEX_NAME)
-        print("✅ 삭제 완료")
+def versioned_indices(alias=INDEX_ALIAS):
+    """alias 이름으로 만들어진 버전별 인덱스 목록"""
+    indices = es.indices.get(index=f"{alias}_v*", ignore_unavailable=True, allow_no_indices=True)
+    return sorted(indices.keys(), key=lambda name: int(name.rsplit('_v', 1)[-1]))
+
+def create_versioned_index(alias=INDEX_ALIAS, body=None):
+    """
+    새 버전 인덱스를 생성합니다.
+    대량 색인 중에는 refresh를 끄고 replica를 0으로 두어 색인 속도를 높입니다.
+    """
+    existing = versioned_indices(alias)
+    version = int(existing[-1].rsplit('_v', 1)[-1]) + 1 if existing else 1
+    index_name = f"{alias}_v{version}"
 
-    print(f"🚀 인덱스 '{INDEX_NAME}' 생성 중...")
-    es.indices.create(index=INDEX_NAME, body=settings)
+    body = body or index_body()
+    body["settings"]["number_of_replicas"] = 0
+    body["settings"]["refresh_interval"] = "-1"
+
+    print(f"🚀 인덱스 '{index_name}' 생성 중...")
+    es.indices.create(index=index_name, body=body)
     print("✅ 인덱스 생성 완료!")
+    return index_name
 
-def index_all_articles():
-    """모든 뉴스 기사를 Elasticsearch에 색인합니다."""
-    print("📝 전체 뉴스 기사 초기 색인 시작...")
-    count = 0
-    for article in NewsArticle.objects.all():
-        try:
-            doc = NewsArticleIndex.from_django(article)
-            doc.save()
+def swap_alias(index_name, alias=INDEX_ALIAS):
+    """
+    색인이 끝난 인덱스를 서비스 가능한 상태로 되돌린 뒤 alias를 원자적으로 옮기고
+    이전 버전 인덱스를 삭제합니다.
+    """
+    es.indices.put_settings(index=index_name, body={
+        "index": {
+            "refresh_interval": "1s",
+            "number_of_replicas": getattr(settings, 'ES_INDEX_REPLICAS', 1),
+        }
+    })
+    es.indices.refresh(index=index_name)
+
+    actions = [{"add": {"index": index_name, "alias": alias}}]
+    old_indices = []
+    if es.indices.exists_alias(name=alias):
+        old_indices = [name for name in es.indices.get_alias(name=alias) if name != index_name]
+        actions = [{"remove": {"index": name, "alias": alias}} for name in old_indices] + actions
+    elif es.indices.exists(index=alias):
+        # alias 도입 이전의 단일 인덱스는 alias 전환과 동시에 삭제
+        actions.insert(0, {"remove_index": {"index": alias}})
+
+    print(f"🔀 alias '{alias}' → '{index_name}' 전환 중...")
+    es.indices.update_aliases(body={"actions": actions})
+
+    for name in old_indices:
+        es.indices.delete(index=name, ignore_unavailable=True)
+        print(f"🗑️ 이전 인덱스 '{name}' 삭제")
+    print("✅ alias 전환 완료")
+
+def generate_actions(queryset, chunk_size, index_name=None):
+    """queryset의 기사들을 bulk API 액션으로 변환합니다 (index_name이 없으면 alias)."""
+    for article in queryset.only(*INDEX_FIELDS).iterator(chunk_size=chunk_size):
+        action = NewsArticleIndex.from_django(article).to_dict(include_meta=True)
+        if index_name:
+            action['_index'] = index_name
+        yield action
+
+def bulk_index(queryset, chunk_size=None, thread_count=None, index_name=None):
+    """
+    bulk API와 워커 스레드로 기사들을 색인합니다.
+    배치마다 처리량을 출력하고 (성공 개수, 색인에 실패한 news_id 집합)을 반환합니다.
+    """
+    chunk_size = chunk_size or getattr(settings, 'ES_BULK_CHUNK_SIZE', 500)
+    thread_count = thread_count or getattr(settings, 'ES_BULK_THREADS', 4)
+
+    started = batch_started = time.time()
+    count = processed = 0
+    failed_ids = set()
+    for ok, info in parallel_bulk(
+        es, generate_actions(queryset, chunk_size, index_name),
+        chunk_size=chunk_size, thread_count=thread_count,
+        raise_on_error=False, raise_on_exception=False,
+    ):
+        processed += 1
+        result = info.get('index', {})
+        if ok:
             count += 1
-        except Exception as e:
-            print(f"⚠️ ID {getattr(article, 'news_id', 'unknown')} 초기 색인 중 오류 발생: {e}")
+        else:
+            failed_ids.add(int(result['_id']))
+            print(f"⚠️ ID {result.get('_id', 'unknown')} 색인 중 오류 발생: {result.get('error')}")
+
+        if processed % chunk_size == 0:
+            elapsed = time.time() - batch_started
+            print(f"📦 {processed}개 처리 ({chunk_size / max(elapsed, 1e-6):.0f} docs/s)")
+            batch_started = time.time()
+
+    elapsed = time.time() - started
+    if processed:
+        print(f"⏱️ {processed}개 처리 {elapsed:.1f}s ({processed / max(elapsed, 1e-6):.0f} docs/s)")
+    return count, failed_ids
+
+def get_checkpoint():
+    """DB에 저장된 색인 체크포인트 (없으면 None)"""
+    return SyncCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+
+def save_checkpoint():
+    """전체 색인 완료 여부와 마지막 동기화 시각을 기록합니다."""
+    SyncCheckpoint.objects.update_or_create(name=CHECKPOINT_NAME)
+
+def delete_outbox_rows(ids):
+    """
+    처리한 outbox 행을 id로 지정해 삭제합니다.
+    id는 커밋 전에 발급되므로 더 작은 id가 나중에 커밋될 수 있습니다. 그래서 최대 id 기준(high-water mark)으로
+    건너뛰지 않고 처리한 행만 지워, 늦게 커밋된 행은 다음 증분 색인에서 처리되도록 합니다.
+    """
+    for start in range(0, len(ids), OUTBOX_BATCH_SIZE):
+        ArticleOutbox.objects.filter(id__in=ids[start:start + OUTBOX_BATCH_SIZE]).delete()
+
+def index_all_articles(chunk_size=None, thread_count=None):
+    """
+    새 버전 인덱스에 모든 뉴스 기사를 색인한 뒤 alias를 전환합니다.
+    색인하는 동안에도 기존 인덱스로 검색이 계속 제공됩니다.
+    """
+    print("📝 전체 뉴스 기사 초기 색인 시작...")
+    # 시작 시점에 커밋되어 보이는 outbox 행은 전체 색인에 반영되므로 완료 후 삭제하고,
+    # 그 이후에 커밋되는 행은 남겨 두어 증분 색인에서 반영
+    visible_ids = list(ArticleOutbox.objects.order_by('id').values_list('id', flat=True))
+
+    index_name = create_versioned_index()
+    count, failed_ids = bulk_index(NewsArticle.objects.order_by('news_id'), chunk_size, thread_count, index_name)
     print(f"✅ 총 {count}개의 뉴스 기사 초기 색인 완료!")
-    # 초기 색인 후 마지막 news_id 업데이트
-    last_indexed_article = NewsArticle.objects.order_by('-news_id').first()
-    if last_indexed_article:
-        update_last_indexed_id(getattr(last_indexed_article, 'news_id'))
-
-# 마지막 색인된 id를 저장할 변수
-last_indexed_id = 0
-
-def get_last_indexed_id():
-    """마지막 색인된 id를 반환합니다."""
-    global last_indexed_id
-    return last_indexed_id
-
-def update_last_indexed_id(article_id):
-    """마지막 색인된 id를 업데이트합니다."""
-    global last_indexed_id
-    last_indexed_id = max(last_indexed_id, article_id)
-    print(f"🔑 마지막 색인 ID 업데이트: {last_indexed_id}")
-
-def index_new_articles():
-    """새로운 뉴스 기사들을 Elasticsearch에 색인합니다 (news_id 기반)."""
-    print("📝 새로운 뉴스 기사 색인 시작 (news_id 기반)...")
-    count = 0
-    queryset = NewsArticle.objects.filter(news_id__gt=get_last_indexed_id()).order_by('news_id')
-
-    for article in queryset:
-        try:
-            doc = NewsArticleIndex.from_django(article)
-            doc.save()
-            update_last_indexed_id(getattr(article, 'news_id'))
-            count += 1
-        except Exception as e:
-            print(f"⚠️ ID {getattr(article, 'news_id', 'unknown')} 색인 중 오류 발생: {e}")
+    swap_alias(index_name)
+    delete_outbox_rows(visible_ids)
+    if failed_ids:
+        # 색인에 실패한 기사는 outbox에 다시 넣어 다음 증분 색인에서 재시도
+        ArticleOutbox.objects.bulk_create([
+            ArticleOutbox(news_id=news_id, operation=ArticleOutbox.OPERATION_UPSERT) for news_id in failed_ids
+        ])
+        print(f"⚠️ {len(failed_ids)}개 기사 색인 실패, 다음 증분 색인에서 재시도합니다.")
+    save_checkpoint()
 
-    print(f"✅ 총 {count}개의 새로운 뉴스 기사 색인 완료 (news_id > {get_last_indexed_id()}).")
+def index_keyword_suggestions():
+    """
+    전체 기사의 키워드/제목 단어 빈도로 자동완성 인덱스를 새 버전으로 만들고 alias를 전환합니다.
+    단어별 빈도가 completion weight가 되어 suggester가 인기 단어부터 반환합니다.
+    """
+    try:
+        started = time.time()
+        frequencies = collect_keyword_frequencies(limit=None)
+        index_name = create_versioned_index(SUGGEST_ALIAS, suggest_index_body())
+        actions = (
+            dict(suggestion_document(word, count).to_dict(include_meta=True), _index=index_name)
+            for word, count in frequencies.items()
+        )
+        success, _ = bulk(es, actions, chunk_size=2000)
+        swap_alias(index_name, SUGGEST_ALIAS)
+        print(f"🔤 자동완성 후보 {success}개 색인 완료 ({time.time() - started:.1f}s)")
+    except Exception as e:
+        print(f"⚠️ 자동완성 인덱스 생성 중 오류 발생: {e}")
+
+def delete_documents(news_ids):
+    """삭제된 기사들의 문서를 인덱스에서 제거하고 (삭제 개수, 실패한 news_id 집합)을 반환합니다."""
+    actions = ({"_op_type": "delete", "_index": INDEX_ALIAS, "_id": news_id} for news_id in news_ids)
+    count, errors = bulk(es, actions, raise_on_error=False, ignore_status=(404,))
+    failed_ids = set()
+    for error in errors:
+        result = error.get('delete', {})
+        failed_ids.add(int(result['_id']))
+        print(f"⚠️ ID {result.get('_id', 'unknown')} 삭제 중 오류 발생: {result.get('error')}")
+    return count, failed_ids
+
+def index_changes(chunk_size=None, thread_count=None):
+    """
+    outbox에 남아 있는 변경분(추가/수정/삭제)만 색인하고 처리한 행을 삭제합니다.
+    처리 비용은 전체 기사 수가 아니라 변경 건수에 비례합니다.
+    색인/삭제에 실패한 기사의 outbox 행은 남겨 두어 다음 실행에서 다시 시도합니다.
+    """
+    total_upserts = total_deletes = total_failed = 0
+    last_id = 0  # 이번 실행에서 읽은 위치 (실패해서 남긴 행을 같은 실행에서 다시 읽지 않도록)
+
+    while True:
+        changes = list(
+            ArticleOutbox.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'news_id', 'operation')[:OUTBOX_BATCH_SIZE]
+        )
+        if not changes:
+            break
+        last_id = changes[-1][0]
+
+        # 기사별 마지막 변경만 반영
+        latest = {}
+        for _, news_id, operation in changes:
+            latest[news_id] = operation
+        upsert_ids = [news_id for news_id, op in latest.items() if op == ArticleOutbox.OPERATION_UPSERT]
+        delete_ids = {news_id for news_id, op in latest.items() if op == ArticleOutbox.OPERATION_DELETE}
+
+        queryset = NewsArticle.objects.filter(news_id__in=upsert_ids).order_by('news_id')
+        existing_ids = set(queryset.values_list('news_id', flat=True))
+        # 수정 후 곧바로 삭제된 기사는 삭제로 처리
+        delete_ids |= set(upsert_ids) - existing_ids
+
+        failed_ids = set()
+        if existing_ids:
+            count, failed = bulk_index(queryset, chunk_size, thread_count)
+            total_upserts += count
+            failed_ids |= failed
+        if delete_ids:
+            count, failed = delete_documents(delete_ids)
+            total_deletes += count
+            failed_ids |= failed
+
+        delete_outbox_rows([outbox_id for outbox_id, news_id, _ in changes if news_id not in failed_ids])
+        total_failed += len(failed_ids)
+
+    save_checkpoint()
+    print(f"✅ 변경분 색인 완료: 추가/수정 {total_upserts}개, 삭제 {total_deletes}개, 실패 {total_failed}개(다음 실행에서 재시도)")
+
+def run_index_changes(chunk_size=None, thread_count=None):
+    """스케줄러용 증분 색인 (Elasticsearch 연결 오류 등으로 작업 루프가 종료되지 않도록 예외를 기록)"""
+    try:
+        index_changes(chunk_size, thread_count)
+    except Exception as e:
+        print(f"⚠️ 변경분 색인 중 오류 발생: {e}")
 
 class Command(BaseCommand):
-    help = 'Elasticsearch 색인 작업을 수행합니다 (초기 색인 및 5분 주기 news_id 기반 업데이트).'
+    help = 'Elasticsearch 색인 작업을 수행합니다 (초기 색인 및 5분 주기 변경분 업데이트).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None, help='bulk 요청당 문서 수 (기본: ES_BULK_CHUNK_SIZE)')
+        parser.add_argument('--workers', type=int, default=None, help='bulk 워커 스레드 수 (기본: ES_BULK_THREADS)')
+        parser.add_argument('--rebuild', action='store_true', help='체크포인트를 무시하고 전체 재색인합니다.')
 
     def handle(self, *args, **options):
-        print("🎬 Elasticsearch 색인 작업을 시작합니다 (news_id 기반).")
+        print("🎬 Elasticsearch 색인 작업을 시작합니다.")
+        chunk_size = options['chunk_size']
+        thread_count = options['workers']
+
+        if options['rebuild'] or not get_checkpoint() or not es.indices.exists_alias(name=INDEX_ALIAS):
+            # 새 버전 인덱스에 전체 데이터 색인 후 alias 전환 (무중단)
+            index_all_articles(chunk_size, thread_count)
+        else:
+            # 재시작 시에는 체크포인트 이후 변경분만 반영
+            print("♻️ outbox에 남은 변경분부터 색인을 재개합니다.")
+            run_index_changes(chunk_size, thread_count)
 
-        # 초기 인덱스 생성 및 전체 데이터 색인
-        create_initial_index()
-        index_all_articles()
+        index_keyword_suggestions()
 
-        print("\n⏰ 5분마다 새로운 뉴스 기사를 색인하는 작업을 시작합니다 (news_id 기반)...")
-        schedule.every(5).minutes.do(index_new_articles)
+        print("\n⏰ 5분마다 변경된 뉴스 기사를 색인하는 작업을 시작합니다...")
+        schedule.every(5).minutes.do(run_index_changes, chunk_size, thread_count)
+        schedule.every(getattr(settings, 'ES_SUGGEST_REFRESH_MINUTES', 60)).minutes.do(index_keyword_suggestions)
 
         while True:
             schedule.run_pending()
@@ -0,0 +1,14 @@
+import time
+from django.core.management.base import BaseCommand
+
+from news_api.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = '조회수/좋아요/댓글 카운터 컬럼을 실제 상호작용 데이터와 맞춥니다.'
+
+    def handle(self, *args, **options):
+        print("🔄 기사 카운터 재계산 중...")
+        started = time.time()
+        updated = reconcile_counters()
+        print(f"✅ 총 {updated}개 기사의 카운터 재계산 완료 ({time.time() - started:.1f}s)")
@@ -0,0 +1,51 @@
+import time
+import schedule
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news_api.models import NewsArticle, ArticleNeighbor
+from news_api.vector_search import refresh_neighbors
+
+
+def refresh_missing_neighbors(rebuild=False):
+    """이웃 목록이 없는 기사(새로 들어온 기사)의 유사 기사를 계산합니다."""
+    queryset = NewsArticle.objects.filter(embedding__isnull=False)
+    if rebuild:
+        print("🔄 전체 유사 기사 목록 재계산 중...")
+        ArticleNeighbor.objects.all().delete()
+    else:
+        queryset = queryset.filter(neighbors__isnull=True)
+
+    started = time.time()
+    count = 0
+    for article in queryset.only('news_id', 'embedding').order_by('news_id').iterator(chunk_size=500):
+        try:
+            refresh_neighbors(article)
+            count += 1
+        except Exception as e:
+            print(f"⚠️ ID {article.news_id} 유사 기사 계산 중 오류 발생: {e}")
+
+    print(f"✅ 총 {count}개 기사의 유사 기사 목록 갱신 완료 ({time.time() - started:.1f}s)")
+
+
+class Command(BaseCommand):
+    help = '기사별 유사 기사 top-K 목록을 사전 계산합니다 (새 기사 주기적 갱신).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='모든 기사의 이웃 목록을 다시 계산합니다.')
+        parser.add_argument('--once', action='store_true', help='한 번만 실행하고 종료합니다.')
+
+    def handle(self, *args, **options):
+        print("🎬 유사 기사 사전 계산 작업을 시작합니다.")
+        refresh_missing_neighbors(rebuild=options['rebuild'])
+
+        if options['once']:
+            return
+
+        minutes = getattr(settings, 'SIMILAR_ARTICLES_REFRESH_MINUTES', 5)
+        print(f"\n⏰ {minutes}분마다 새 기사의 유사 기사 목록을 계산합니다...")
+        schedule.every(minutes).minutes.do(refresh_missing_neighbors)
+
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
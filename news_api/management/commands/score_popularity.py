@@ -0,0 +1,38 @@
+import time
+import schedule
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news_api.counters import update_popularity_scores
+
+
+def score_articles():
+    """기사 인기도 점수를 다시 계산합니다."""
+    started = time.time()
+    try:
+        updated = update_popularity_scores()
+        print(f"✅ 인기도 점수 갱신 완료: {updated}개 기사 ({time.time() - started:.1f}s)")
+    except Exception as e:
+        print(f"⚠️ 인기도 점수 계산 중 오류 발생: {e}")
+
+
+class Command(BaseCommand):
+    help = '기사 인기도 점수(ArticlePopularity)를 주기적으로 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='한 번만 실행하고 종료합니다.')
+
+    def handle(self, *args, **options):
+        print("🎬 인기도 점수 계산 작업을 시작합니다.")
+        score_articles()
+
+        if options['once']:
+            return
+
+        minutes = getattr(settings, 'POPULARITY_SCORE_INTERVAL_MINUTES', 10)
+        print(f"\n⏰ {minutes}분마다 인기도 점수를 다시 계산합니다...")
+        schedule.every(minutes).minutes.do(score_articles)
+
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
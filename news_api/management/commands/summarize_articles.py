@@ -0,0 +1,49 @@
+import time
+import schedule
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news_api.digests import pending_articles, generate_digest, record_digest_failure
+
+
+def summarize_pending(limit=None):
+    """요약이 없는 새 기사(또는 내용이 바뀐 기사)의 요약/핵심 포인트를 생성합니다."""
+    limit = limit or getattr(settings, 'DIGEST_BATCH_SIZE', 20)
+    started = time.time()
+    count = 0
+    for article in pending_articles(limit):
+        try:
+            generate_digest(article)
+            count += 1
+        except Exception as e:
+            print(f"⚠️ ID {article.news_id} 요약 생성 중 오류 발생: {e}")
+            try:
+                record_digest_failure(article)
+            except Exception as e:
+                print(f"⚠️ ID {article.news_id} 실패 기록 중 오류 발생: {e}")
+
+    if count:
+        print(f"✅ 총 {count}개 기사의 요약 생성 완료 ({time.time() - started:.1f}s)")
+
+
+class Command(BaseCommand):
+    help = '새 기사의 LLM 요약과 핵심 포인트를 주기적으로 미리 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='한 번에 요약할 기사 수 (기본: DIGEST_BATCH_SIZE)')
+        parser.add_argument('--once', action='store_true', help='한 번만 실행하고 종료합니다.')
+
+    def handle(self, *args, **options):
+        print("🎬 기사 요약 생성 작업을 시작합니다.")
+        summarize_pending(options['limit'])
+
+        if options['once']:
+            return
+
+        minutes = getattr(settings, 'DIGEST_INTERVAL_MINUTES', 5)
+        print(f"\n⏰ {minutes}분마다 새 기사의 요약을 생성합니다...")
+        schedule.every(minutes).minutes.do(summarize_pending, options['limit'])
+
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import pgvector.django.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0006_alter_newsarticle_embedding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('distance', models.FloatField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='newsarticle_embedding_hnsw', opclasses=['vector_cosine_ops']),
+        ),
+        migrations.AddField(
+            model_name='articleneighbor',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='news_api.newsarticle'),
+        ),
+        migrations.AddField(
+            model_name='articleneighbor',
+            name='neighbor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='news_api.newsarticle'),
+        ),
+        migrations.AddIndex(
+            model_name='articleneighbor',
+            index=models.Index(fields=['article', 'distance'], name='neighbor_article_distance'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='articleneighbor',
+            unique_together={('article', 'neighbor')},
+        ),
+    ]
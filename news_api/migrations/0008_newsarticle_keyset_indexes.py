@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0007_ann_index_article_neighbor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['-updated', '-news_id'], name='newsarticle_updated_id'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['category', '-updated', '-news_id'], name='newsarticle_cat_updated_id'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0008_newsarticle_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        # default=0은 Django 안에서만 적용되므로, ORM을 거치지 않는 데이터 파이프라인 INSERT가
+        # NOT NULL 오류 없이 동작하도록 컬럼에도 DB 기본값을 지정
+        migrations.RunSQL(
+            sql="""
+                ALTER TABLE news_api_newsarticle
+                    ALTER COLUMN view_count SET DEFAULT 0,
+                    ALTER COLUMN like_count SET DEFAULT 0,
+                    ALTER COLUMN comment_count SET DEFAULT 0;
+            """,
+            reverse_sql="""
+                ALTER TABLE news_api_newsarticle
+                    ALTER COLUMN view_count DROP DEFAULT,
+                    ALTER COLUMN like_count DROP DEFAULT,
+                    ALTER COLUMN comment_count DROP DEFAULT;
+            """,
+        ),
+        # 기존 상호작용 데이터로 카운터 초기화
+        migrations.RunSQL(
+            sql="""
+                UPDATE news_api_newsarticle a SET
+                    view_count = (SELECT COUNT(*) FROM news_api_view v WHERE v.news_id = a.news_id),
+                    like_count = (SELECT COUNT(*) FROM news_api_like l WHERE l.news_id = a.news_id),
+                    comment_count = (SELECT COUNT(*) FROM news_api_comment c WHERE c.news_id = a.news_id);
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0009_newsarticle_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticlePopularity',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='news_api.newsarticle')),
+                ('category', models.CharField(blank=True, max_length=255, null=True)),
+                ('score', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', '-article'], name='popularity_score'), models.Index(fields=['category', '-score', '-article'], name='popularity_cat_score')],
+            },
+        ),
+    ]
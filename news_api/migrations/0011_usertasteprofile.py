@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import pgvector.django.vector
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('news_api', '0010_articlepopularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTasteProfile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='taste_profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('embedding', pgvector.django.vector.VectorField(blank=True, dimensions=768, null=True)),
+                ('liked_news_ids', models.JSONField(default=list)),
+                ('top_categories', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
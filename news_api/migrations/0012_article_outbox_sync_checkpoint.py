@@ -0,0 +1,73 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0011_usertasteprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('news_id', models.IntegerField()),
+                ('operation', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        # 데이터 파이프라인이 DB에 직접 쓰는 변경도 기록되도록 트리거로 outbox 작성
+        # (카운터/인기도 점수처럼 검색 문서와 무관한 컬럼 변경은 제외)
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION news_api_article_outbox() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP = 'DELETE' THEN
+                        INSERT INTO news_api_articleoutbox (news_id, operation, created_at)
+                        VALUES (OLD.news_id, 'delete', now());
+                        RETURN OLD;
+                    END IF;
+                    INSERT INTO news_api_articleoutbox (news_id, operation, created_at)
+                    VALUES (NEW.news_id, 'upsert', now());
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER news_api_article_outbox_insert_delete
+                    AFTER INSERT OR DELETE ON news_api_newsarticle
+                    FOR EACH ROW EXECUTE FUNCTION news_api_article_outbox();
+
+                CREATE TRIGGER news_api_article_outbox_update
+                    AFTER UPDATE ON news_api_newsarticle
+                    FOR EACH ROW
+                    WHEN (
+                        OLD.title IS DISTINCT FROM NEW.title
+                        OR OLD.author IS DISTINCT FROM NEW.author
+                        OR OLD.link IS DISTINCT FROM NEW.link
+                        OR OLD.summary IS DISTINCT FROM NEW.summary
+                        OR OLD.updated IS DISTINCT FROM NEW.updated
+                        OR OLD.full_text IS DISTINCT FROM NEW.full_text
+                        OR OLD.category IS DISTINCT FROM NEW.category
+                        OR OLD.keywords IS DISTINCT FROM NEW.keywords
+                        OR OLD.embedding IS DISTINCT FROM NEW.embedding
+                    )
+                    EXECUTE FUNCTION news_api_article_outbox();
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS news_api_article_outbox_update ON news_api_newsarticle;
+                DROP TRIGGER IF EXISTS news_api_article_outbox_insert_delete ON news_api_newsarticle;
+                DROP FUNCTION IF EXISTS news_api_article_outbox();
+            """,
+        ),
+    ]
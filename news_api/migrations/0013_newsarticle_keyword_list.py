@@ -0,0 +1,54 @@
+# Generated by Django 4.2.20 on 2026-10-17 01:03
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0012_article_outbox_sync_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='keyword_list',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, size=None),
+        ),
+        # 데이터 파이프라인이 keywords만 써도 keyword_list가 채워지도록 BEFORE 트리거로 파싱
+        # (news_api.keywords.parse_keywords와 같은 규칙: 중괄호/따옴표 제거, 쉼표 분리, 공백 제거)
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION news_api_parse_keywords(raw text) RETURNS text[] AS $$
+                    SELECT COALESCE(array_agg(btrim(keyword) ORDER BY position), '{}')
+                    FROM unnest(string_to_array(translate(COALESCE(raw, ''), '{}"', ''), ','))
+                         WITH ORDINALITY AS parts(keyword, position)
+                    WHERE btrim(keyword) <> ''
+                $$ LANGUAGE sql IMMUTABLE;
+
+                CREATE OR REPLACE FUNCTION news_api_newsarticle_keyword_list() RETURNS trigger AS $$
+                BEGIN
+                    NEW.keyword_list := news_api_parse_keywords(NEW.keywords);
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER news_api_newsarticle_keyword_list
+                    BEFORE INSERT OR UPDATE OF keywords ON news_api_newsarticle
+                    FOR EACH ROW EXECUTE FUNCTION news_api_newsarticle_keyword_list();
+
+                UPDATE news_api_newsarticle SET keyword_list = news_api_parse_keywords(keywords);
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS news_api_newsarticle_keyword_list ON news_api_newsarticle;
+                DROP FUNCTION IF EXISTS news_api_newsarticle_keyword_list();
+                DROP FUNCTION IF EXISTS news_api_parse_keywords(text);
+            """,
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['keyword_list'], name='newsarticle_keyword_list_gin'),
+        ),
+    ]
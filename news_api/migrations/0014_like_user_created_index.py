@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0013_newsarticle_keyword_list'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='like_user_created'),
+        ),
+    ]
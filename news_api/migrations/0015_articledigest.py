@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-17 01:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_api', '0014_like_user_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleDigest',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='digest', serialize=False, to='news_api.newsarticle')),
+                ('summary', models.TextField(blank=True)),
+                ('key_points', models.JSONField(default=list)),
+                ('model', models.CharField(blank=True, max_length=100)),
+                ('source_updated', models.DateTimeField(null=True)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('failed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
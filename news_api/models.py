@@ -1,5 +1,7 @@
 from django.db import models
-from pgvector.django import VectorField
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from pgvector.django import VectorField, HnswIndex
 from accounts.models import User
 
 class NewsArticle(models.Model):
@@ -12,12 +14,104 @@ class NewsArticle(models.Model):
     full_text = models.TextField(default='')
     category = models.CharField(max_length=255, blank=True, null=True)
     keywords = models.TextField(blank=True, null=True)
+    # keywords 문자열을 파싱한 배열 (DB 트리거가 keywords 저장 시 자동으로 채움)
+    keyword_list = ArrayField(models.TextField(), default=list, blank=True)
     embedding = VectorField(dimensions=768, blank=True, null=True)
 
+    # 상호작용 카운터 (toggle_like, news_detail, comments_view에서 갱신)
+    # 데이터 파이프라인의 직접 INSERT를 위해 DB 기본값 0도 설정됨 (0009 마이그레이션)
+    view_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # 코사인 거리 기반 ANN 검색용 HNSW 인덱스
+            HnswIndex(
+                name='newsarticle_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+            # news_page keyset 페이지네이션용 인덱스
+            models.Index(fields=['-updated', '-news_id'], name='newsarticle_updated_id'),
+            models.Index(fields=['category', '-updated', '-news_id'], name='newsarticle_cat_updated_id'),
+            # 키워드 포함 검색(keyword_list__contains / __overlap)용 GIN 인덱스
+            GinIndex(fields=['keyword_list'], name='newsarticle_keyword_list_gin'),
+        ]
+
     def __str__(self):
         return self.title
 
 
+class ArticleNeighbor(models.Model):
+    """기사별 유사 기사 top-K 사전 계산 결과"""
+    article = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(NewsArticle, on_delete=models.CASCADE, related_name='+')
+    distance = models.FloatField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('article', 'neighbor')
+        indexes = [
+            models.Index(fields=['article', 'distance'], name='neighbor_article_distance'),
+        ]
+
+
+class ArticlePopularity(models.Model):
+    """
+    비로그인 추천용 기사 인기도 점수 (score_popularity 명령으로 주기적 계산)
+    주기적으로 바뀌는 점수를 넓은 기사 행과 인덱스(HNSW, GIN)에서 분리해 점수 갱신이 좁은 행만 다시 쓰도록 합니다.
+    """
+    article = models.OneToOneField(NewsArticle, on_delete=models.CASCADE, primary_key=True, related_name='popularity')
+    category = models.CharField(max_length=255, blank=True, null=True)  # 카테고리별 인기순 조회용 복사본
+    score = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', '-article'], name='popularity_score'),
+            models.Index(fields=['category', '-score', '-article'], name='popularity_cat_score'),
+        ]
+
+
+class ArticleDigest(models.Model):
+    """
+    LLM으로 미리 생성한 기사 요약과 핵심 포인트 (summarize_articles 명령으로 생성)
+    생성에 실패한 기사도 행을 만들어 실패 횟수를 기록합니다. (source_updated가 비어 있으면 아직 요약 없음)
+    """
+    article = models.OneToOneField(NewsArticle, on_delete=models.CASCADE, primary_key=True, related_name='digest')
+    summary = models.TextField(blank=True)
+    key_points = models.JSONField(default=list)
+    model = models.CharField(max_length=100, blank=True)
+    source_updated = models.DateTimeField(null=True)  # 요약 생성 시점의 기사 updated (기사가 바뀌면 다시 생성)
+    failures = models.PositiveIntegerField(default=0)  # 마지막 성공 이후 연속 실패 횟수
+    failed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class ArticleOutbox(models.Model):
+    """기사 변경 이력 (news_api_newsarticle 트리거가 INSERT/UPDATE/DELETE 시 기록)"""
+    OPERATION_UPSERT = 'upsert'
+    OPERATION_DELETE = 'delete'
+
+    news_id = models.IntegerField()
+    operation = models.CharField(max_length=10)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class SyncCheckpoint(models.Model):
+    """
+    동기화 작업별 상태 (행이 있으면 전체 색인이 완료된 것, updated_at은 마지막 동기화 시각)
+    처리할 변경분은 ArticleOutbox에 남아 있는 행으로 판단합니다.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.updated_at}"
+
+
 class Like(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     news = models.ForeignKey(NewsArticle, on_delete=models.CASCADE)
@@ -25,6 +119,10 @@ class Like(models.Model):
 
     class Meta:
         unique_together = ('user', 'news')
+        indexes = [
+            # liked_articles 최신순 페이지네이션용 인덱스
+            models.Index(fields=['user', '-created_at', '-id'], name='like_user_created'),
+        ]
 
 
 class View(models.Model):
@@ -36,6 +134,15 @@ class View(models.Model):
         unique_together = ('user', 'news')
 
 
+class UserTasteProfile(models.Model):
+    """좋아요 기록으로 계산한 사용자 취향 벡터 (좋아요 변경 시 갱신)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='taste_profile')
+    embedding = VectorField(dimensions=768, blank=True, null=True)
+    liked_news_ids = models.JSONField(default=list)   # 계산에 사용된 최근 좋아요 기사 ID
+    top_categories = models.JSONField(default=list)   # 좋아요 기사 상위 카테고리 (최대 3개)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
 class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     news = models.ForeignKey(NewsArticle, on_delete=models.CASCADE)
@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+
+def encode_cursor(values):
+    """정렬 키 값 목록을 URL-safe 커서 문자열로 변환"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """커서 문자열을 정렬 키 값 목록으로 복원 (잘못된 커서는 None)"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def keyset_condition(ordering, values):
+    """(a, b, ...) 가 커서 위치보다 뒤에 오는 행을 찾는 사전식 비교 조건 생성"""
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            clause &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= clause
+    return condition
+
+
+def ordering_field(queryset, name):
+    """정렬 키(필드명, annotation, 관계 경로)에 해당하는 모델 필드를 찾습니다."""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    model = queryset.model
+    field = None
+    for part in name.split(LOOKUP_SEP):
+        field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    # 외래키 자체로 정렬하면 대상 모델의 PK 값이 커서에 들어갑니다
+    return field.target_field if field.is_relation else field
+
+
+def parse_cursor(queryset, ordering, cursor):
+    """커서를 디코딩하고 각 값을 정렬 키 필드의 타입으로 변환 (잘못된 커서는 ValueError)"""
+    values = decode_cursor(cursor)
+    if values is None or len(values) != len(ordering):
+        raise ValueError("Invalid cursor")
+    try:
+        values = [
+            ordering_field(queryset, field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except (ValidationError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    # NULL은 크기 비교가 불가능하므로 커서 값으로 쓸 수 없음
+    if any(value is None for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_page(queryset, page_size, cursor=None, offset=0):
+    """
+    queryset의 정렬 순서를 기준으로 한 페이지를 가져옵니다.
+    cursor가 있으면 keyset 방식(WHERE 조건)으로, 없으면 offset 방식으로 조회하고
+    다음 페이지 커서를 함께 반환합니다. 정렬 키는 문자열 필드명이어야 합니다.
+    """
+    ordering = [f for f in queryset.query.order_by if isinstance(f, str)]
+    # 정렬 키가 유일하도록 PK를 마지막 기준으로 추가
+    if not any(f.lstrip('-') in ('pk', queryset.model._meta.pk.name) for f in ordering):
+        ordering.append('-pk')
+    queryset = queryset.order_by(*ordering)
+
+    if cursor:
+        values = parse_cursor(queryset, ordering, cursor)
+        queryset = queryset.filter(keyset_condition(ordering, values))
+        offset = 0
+
+    items = list(queryset[offset:offset + page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+
+    next_cursor = None
+    if has_next:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, f.lstrip('-')) for f in ordering])
+
+    return items, next_cursor
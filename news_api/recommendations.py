@@ -0,0 +1,117 @@
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+import numpy as np
+from .models import NewsArticle, Like, UserTasteProfile
+from .caching import latest_news_id
+
+
+def _profile_cache_key(user_id):
+    return f"taste_profile:{user_id}"
+
+
+def _profile_to_dict(profile):
+    return {
+        'embedding': np.array(profile.embedding) if profile.embedding is not None else None,
+        'liked_ids': list(profile.liked_news_ids),
+        'top_categories': list(profile.top_categories),
+    }
+
+
+def refresh_taste_profile(user):
+    """
+    사용자의 최근 좋아요 10개로 취향 벡터를 다시 계산해 저장하고 캐시에 올립니다.
+    (좋아요가 바뀔 때만 호출되므로 페이지 요청마다 계산하지 않음)
+    """
+    recent_likes = Like.objects.filter(user=user).select_related('news').only(
+        'news', 'news__embedding', 'news__category'
+    ).order_by('-created_at')[:10]
+    liked_articles = [like.news for like in recent_likes]
+
+    # 좋아요한 기사들의 embedding (최신 좋아요에 더 높은 가중치)
+    liked_embeddings = []
+    embedding_weights = []
+    for i, article in enumerate(liked_articles):
+        if article.embedding is not None:
+            liked_embeddings.append(np.array(article.embedding))
+            # 최신 좋아요일수록 높은 가중치 (1.0, 0.9, ..., 최소 0.1)
+            embedding_weights.append(max(1.0 - (i * 0.1), 0.1))
+
+    avg_embedding = None
+    if liked_embeddings:
+        avg_embedding = np.average(np.array(liked_embeddings), axis=0, weights=np.array(embedding_weights))
+
+    categories = [article.category for article in liked_articles if article.category]
+    profile, _ = UserTasteProfile.objects.update_or_create(
+        user=user,
+        defaults={
+            'embedding': avg_embedding,
+            'liked_news_ids': [article.news_id for article in liked_articles],
+            'top_categories': [cat for cat, _ in Counter(categories).most_common(3)],
+        }
+    )
+
+    data = _profile_to_dict(profile)
+    cache.set(_profile_cache_key(user.pk), data, getattr(settings, 'TASTE_PROFILE_CACHE_SECONDS', 3600))
+    # 취향이 바뀌었으므로 추천 순위 스냅샷도 무효화
+    invalidate_ranking_snapshots(user.pk)
+    return data
+
+
+def get_taste_profile(user):
+    """캐시 → DB → 재계산 순으로 사용자 취향 프로필을 가져옵니다."""
+    data = cache.get(_profile_cache_key(user.pk))
+    if data is not None:
+        return data
+
+    profile = UserTasteProfile.objects.filter(user=user).first()
+    if profile is None:
+        return refresh_taste_profile(user)
+
+    data = _profile_to_dict(profile)
+    cache.set(_profile_cache_key(user.pk), data, getattr(settings, 'TASTE_PROFILE_CACHE_SECONDS', 3600))
+    return data
+
+
+def _snapshot_version(user_id):
+    return cache.get(f"rec_snapshot_version:{user_id}", 0)
+
+
+def invalidate_ranking_snapshots(user_id):
+    """사용자의 모든 카테고리 추천 스냅샷을 무효화 (버전 키 교체)"""
+    cache.set(f"rec_snapshot_version:{user_id}", time.time_ns(), None)
+
+
+def get_ranking_snapshot(user, scope, build_queryset):
+    """
+    (사용자, 카테고리)별 추천 순위 상위 N개 ID 목록을 짧은 TTL로 캐시합니다.
+    새 기사가 들어오면 최신 기사 ID가 바뀌어 자동으로 다시 계산됩니다.
+    """
+    key = f"rec_snapshot:{user.pk}:{scope}:{_snapshot_version(user.pk)}:{latest_news_id()}"
+    ranked_ids = cache.get(key)
+    if ranked_ids is None:
+        size = getattr(settings, 'RANKING_SNAPSHOT_SIZE', 240)
+        ranked_ids = list(build_queryset().values_list('news_id', flat=True)[:size])
+        cache.set(key, ranked_ids, getattr(settings, 'RANKING_SNAPSHOT_SECONDS', 300))
+    return ranked_ids
+
+
+def ranked_page(user, scope, build_queryset, page_size, offset):
+    """
+    추천 스냅샷에서 offset 위치의 한 페이지를 가져옵니다.
+    스냅샷 범위를 넘어선 페이지만 실시간 쿼리로 조회하며 (기사 목록, 다음 offset)을 반환합니다.
+    """
+    ranked_ids = get_ranking_snapshot(user, scope, build_queryset)
+    snapshot_full = len(ranked_ids) >= getattr(settings, 'RANKING_SNAPSHOT_SIZE', 240)
+
+    if offset + page_size > len(ranked_ids) and snapshot_full:
+        items = list(build_queryset()[offset:offset + page_size + 1])
+        has_next = len(items) > page_size
+        return items[:page_size], (offset + page_size if has_next else None)
+
+    page_ids = ranked_ids[offset:offset + page_size]
+    articles = NewsArticle.objects.defer('full_text', 'embedding').in_bulk(page_ids)
+    items = [articles[news_id] for news_id in page_ids if news_id in articles]
+    has_next = offset + page_size < len(ranked_ids) or snapshot_full
+    return items, (offset + page_size if has_next else None)
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from django.conf import settings
+
+
+def normalize(text):
+    """공백 차이를 무시하도록 프롬프트/질문 정규화"""
+    return ' '.join(text.split())
+
+
+class ResponseCache:
+    """
+    챗봇 응답 캐시 (프로세스 내 LRU + TTL).
+    (모드, 정규화한 프롬프트 해시)가 같으면 그대로 재사용하고, semantic_modes에 속한 모드는
+    질문 embedding의 코사인 유사도가 threshold 이상인 이전 답변도 재사용합니다.
+    질문 벡터는 모드별로 따로 보관하고, 유사도 계산은 락 밖에서 벡터 행렬 스냅샷으로 수행합니다.
+    """
+
+    def __init__(self, max_entries=1000, ttl=3600, semantic_modes=(), threshold=0.95):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_modes = set(semantic_modes)
+        self.threshold = threshold
+        # key → (저장 시각, 응답)
+        self._entries = OrderedDict()
+        # 모드 → {key: 정규화된 질문 벡터}, 모드 → (keys, 벡터 행렬) 스냅샷, 모드 → 변경 버전
+        self._vectors = {}
+        self._matrices = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(mode, prompt):
+        return mode, hashlib.sha256(normalize(prompt).encode()).hexdigest()
+
+    def _embed(self, mode, message):
+        """semantic 대상 모드의 질문 벡터 (단위 벡터, 실패 시 None)"""
+        if mode not in self.semantic_modes or not message:
+            return None
+        try:
+            from .embeddings import embed_text
+            vector = np.array(embed_text(normalize(message)), dtype=np.float32)
+        except Exception as e:
+            print(f"Response cache embedding error: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _remove(self, key):
+        """항목과 질문 벡터 제거 (락을 잡은 상태에서 호출)"""
+        del self._entries[key]
+        vectors = self._vectors.get(key[0])
+        if vectors and vectors.pop(key, None) is not None:
+            self._versions[key[0]] = self._versions.get(key[0], 0) + 1
+            self._matrices.pop(key[0], None)
+
+    def _matrix(self, mode):
+        """모드의 (keys, 벡터 행렬) 스냅샷. 변경 후 처음 조회할 때 락 밖에서 다시 만듭니다."""
+        with self._lock:
+            snapshot = self._matrices.get(mode)
+            if snapshot is not None:
+                return snapshot
+            items = list(self._vectors.get(mode, {}).items())
+            version = self._versions.get(mode, 0)
+
+        if items:
+            keys, vectors = zip(*items)
+            snapshot = (keys, np.vstack(vectors))
+        else:
+            snapshot = ((), None)
+        with self._lock:
+            if self._versions.get(mode, 0) == version:
+                self._matrices[mode] = snapshot
+        return snapshot
+
+    def get(self, mode, prompt, message=None):
+        """캐시된 응답 반환 (없으면 None)"""
+        key = self.make_key(mode, prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                self._remove(key)  # TTL 만료
+
+        vector = self._embed(mode, message)
+        if vector is not None:
+            keys, matrix = self._matrix(mode)
+            if matrix is not None:
+                scores = matrix @ vector
+                candidates = np.flatnonzero(scores >= self.threshold)
+                # 유사도가 높은 순으로 아직 유효한 항목을 찾음 (스냅샷 이후 제거·만료된 항목은 건너뜀)
+                with self._lock:
+                    for index in candidates[np.argsort(-scores[candidates])]:
+                        other_key = keys[index]
+                        entry = self._entries.get(other_key)
+                        if entry and now - entry[0] <= self.ttl:
+                            self._entries.move_to_end(other_key)
+                            self.semantic_hits += 1
+                            return entry[1]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, mode, prompt, response, message=None):
+        """응답 저장 (가득 차면 가장 오래 사용하지 않은 항목부터 제거)"""
+        key = self.make_key(mode, prompt)
+        vector = self._embed(mode, message)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time(), response)
+            if vector is not None:
+                self._vectors.setdefault(mode, {})[key] = vector
+                self._versions[mode] = self._versions.get(mode, 0) + 1
+                self._matrices.pop(mode, None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self):
+        """적중률 지표 (캐시가 프로세스마다 따로 있으므로 이 프로세스의 값만 집계)"""
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "scope": "process",
+                "pid": os.getpid(),
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=getattr(settings, 'CHATBOT_CACHE_MAX_ENTRIES', 1000),
+    ttl=getattr(settings, 'CHATBOT_CACHE_SECONDS', 3600),
+    semantic_modes=getattr(settings, 'CHATBOT_SEMANTIC_CACHE_MODES', []),
+    threshold=getattr(settings, 'CHATBOT_SEMANTIC_CACHE_THRESHOLD', 0.95),
+)
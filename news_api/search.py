@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from elasticsearch_dsl import Q, MultiSearch
+from .models import NewsArticle
+from .serializers import SearchNewsSerializer
+from .search_indexes import NewsArticleIndex
+from .embeddings import embed_query
+
+# 검색 응답에 필요한 필드 (SearchNewsSerializer.Meta.fields와 동일)
+SEARCH_SOURCE_FIELDS = list(SearchNewsSerializer.Meta.fields)
+
+
+def hits_to_dicts(hits):
+    """검색 결과 hit의 _source를 순위 그대로 dict 목록으로 변환"""
+    results = []
+    for hit in hits:
+        source = dict(hit.to_dict(), news_id=int(hit.meta.id))
+        # 버전 인덱스에서 온 hit은 날짜가 문자열이므로 DB 응답과 같은 형식이 되도록 변환
+        if isinstance(source.get('updated'), str):
+            source['updated'] = parse_datetime(source['updated'])
+        results.append(source)
+    return results
+
+
+def articles_in_hit_order(ids):
+    """DB에서 기사를 가져오되 Elasticsearch가 반환한 순위를 유지합니다."""
+    articles = NewsArticle.objects.only(*SEARCH_SOURCE_FIELDS).in_bulk(ids)
+    return [articles[news_id] for news_id in ids if news_id in articles]
+
+
+def keyword_query(query):
+    """제목/요약 대상 BM25 검색 쿼리"""
+    return Q("multi_match",
+        query=query,
+        fields=["title^2", "summary"],  # title에 가중치
+        fuzziness="AUTO"  # 유사 검색 허용
+    )
+
+
+def search_filter_clauses(category=None, date_from=None, date_to=None):
+    """
+    카테고리/날짜 조건 목록 (date_from, date_to는 YYYY-MM-DD 형식이며 해당 일자를 포함)
+    """
+    clauses = []
+    if category:
+        clauses.append(Q("term", category=category))
+
+    date_range = {}
+    if date_from:
+        date_range["gte"] = f"{date_from}||/d"
+    if date_to:
+        date_range["lte"] = f"{date_to}||/d"
+    if date_range:
+        clauses.append(Q("range", updated=date_range))
+    return clauses
+
+
+def apply_search_filters(s, category=None, date_from=None, date_to=None):
+    """
+    카테고리/날짜 조건을 filter 컨텍스트로 추가합니다.
+    점수 계산에 참여하지 않아 Elasticsearch 쿼리 캐시를 사용할 수 있습니다.
+    """
+    for clause in search_filter_clauses(category, date_from, date_to):
+        s = s.filter(clause)
+    return s
+
+
+def parse_track_total_hits(value):
+    """track_total_hits 파라미터 변환 ('true'/'false'/정수, 없으면 None)"""
+    if value in (None, ''):
+        return None
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return int(value)
+
+
+def reciprocal_rank_fusion(*ranked_lists, k=60):
+    """여러 순위 목록을 RRF 점수(sum 1 / (k + rank))로 합쳐 하나의 순위로 반환"""
+    scores = {}
+    for ranked in ranked_lists:
+        for rank, key in enumerate(ranked, 1):
+            scores[key] = scores.get(key, 0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def hybrid_search(query, size, category=None, date_from=None, date_to=None):
+    """
+    BM25 검색과 embedding kNN 검색을 한 번의 msearch 요청으로 실행하고
+    reciprocal rank fusion으로 합친 상위 size개 결과(dict)를 반환합니다.
+    질의 embedding 생성에 실패하면 BM25 결과만 사용합니다.
+    """
+    window = max(size, getattr(settings, 'HYBRID_SEARCH_WINDOW', 50))
+    clauses = search_filter_clauses(category, date_from, date_to)
+
+    bm25 = NewsArticleIndex.search().query(keyword_query(query))
+    bm25 = apply_search_filters(bm25, category, date_from, date_to)
+    ms = MultiSearch().add(
+        bm25.source(SEARCH_SOURCE_FIELDS)[:window]
+    )
+
+    try:
+        query_vector = embed_query(query)
+    except Exception as e:
+        print(f"Query embedding error: {e}")
+        query_vector = None
+
+    if query_vector is not None:
+        knn = NewsArticleIndex.search().knn(
+            'embedding', k=window,
+            num_candidates=getattr(settings, 'HYBRID_SEARCH_NUM_CANDIDATES', 100),
+            query_vector=query_vector,
+            filter=Q("bool", filter=clauses) if clauses else None,
+        )
+        ms = ms.add(knn.source(SEARCH_SOURCE_FIELDS)[:window])
+
+    hits = {}
+    ranked_lists = []
+    for response in ms.execute():
+        docs = hits_to_dicts(response)
+        ranked_lists.append([doc['news_id'] for doc in docs])
+        for doc in docs:
+            hits.setdefault(doc['news_id'], doc)
+
+    fused = reciprocal_rank_fusion(*ranked_lists, k=getattr(settings, 'HYBRID_SEARCH_RRF_K', 60))
+    return [hits[news_id] for news_id in fused[:size]]
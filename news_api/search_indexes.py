@@ -1,24 +1,49 @@
-from elasticsearch_dsl import Document, Text, Keyword, Date
+from django.conf import settings
+from elasticsearch_dsl import Document, Text, Keyword, Date, Integer, DenseVector, Completion, analyzer
 from elasticsearch_dsl.connections import connections
 from .models import NewsArticle
 
 connections.create_connection(hosts=["http://elasticsearch:9200"])
 
 class NewsArticleIndex(Document):
+    news_id = Integer()
     title = Text()
     summary = Text()
     category = Keyword()
     updated = Date()
+    # 검색 결과를 _source만으로 응답하기 위한 필드
+    author = Keyword()
+    link = Keyword(index=False)
+    # 하이브리드 검색(kNN)용 기사 embedding
+    embedding = DenseVector(dims=768, index=True, similarity='cosine')
 
     class Index:
-        name = "news_articles"
+        # 버전별 인덱스를 가리키는 alias (indexing 명령이 무중단으로 전환)
+        name = getattr(settings, 'ES_INDEX_ALIAS', 'news_articles')
 
     @classmethod
     def from_django(cls, instance: NewsArticle):
         return cls(
             meta={"id": instance.news_id},
+            news_id=instance.news_id,
             title=instance.title,
             summary=instance.summary or '',
             category=instance.category or '',
             updated=instance.updated,
+            author=instance.author or '',
+            link=instance.link,
+            embedding=[float(v) for v in instance.embedding] if instance.embedding is not None else None,
         )
+
+
+# 자모 단위로 분해한 입력을 그대로 prefix 매칭하기 위한 analyzer
+suggest_analyzer = analyzer('suggest_analyzer', tokenizer='keyword', filter=['lowercase'])
+
+
+class KeywordSuggestion(Document):
+    """자동완성 후보 단어 (문서 하나가 키워드/제목 단어 하나)"""
+    text = Keyword(index=False)
+    suggest = Completion(analyzer=suggest_analyzer, preserve_separators=True)
+
+    class Index:
+        name = getattr(settings, 'ES_SUGGEST_ALIAS', 'news_keyword_suggest')
@@ -1,57 +1,62 @@
 from rest_framework import serializers
 from .models import NewsArticle, Comment, Like
-from elasticsearch_dsl import Document, Text, Keyword, Date
-from elasticsearch_dsl.connections import connections
-from .models import NewsArticle
-
-# ElasticSearch 서버 연결 (http://elasticsearch:9200)
-connections.create_connection(hosts=['http://elasticsearch:9200'])
-
-class NewsArticleIndex(Document):
-    # 검색 대상 필드
-    title = Text()       # 본문 검색 가능
-    summary = Text()     # 요약도 검색 가능
-    category = Keyword() # 카테고리 필터링용
-    updated = Date()     # 최신 정렬 가능
-
-    class Index:
-        name = 'news_articles'  # ElasticSearch에 생성될 인덱스 이름
-
-    @classmethod
-    def from_django(cls, instance: NewsArticle):
-        return cls(
-            meta={'id': instance.news_id},
-            title=instance.title,
-            summary=instance.summary or '',
-            category=instance.category or '',
-            updated=instance.updated,
-        )
+from .search_indexes import NewsArticleIndex
+
+
+def _current_user(serializer):
+    request = serializer.context.get('request')
+    if request and request.user.is_authenticated:
+        return request.user
+    return None
+
+
+class NewsListSerializer(serializers.ListSerializer):
+    """
+    기사 목록 직렬화 시 현재 사용자가 좋아요한 기사 ID를 한 번의 쿼리로 미리 조회해
+    context['liked_ids']로 전달합니다. (like_count는 NewsArticle 컬럼이라 추가 쿼리 없음)
+    """
+
+    def to_representation(self, data):
+        articles = list(data.all() if hasattr(data, 'all') else data)
+        if 'liked_ids' not in self.context:
+            user = _current_user(self)
+            self.context['liked_ids'] = set(Like.objects.filter(
+                user=user, news_id__in=[article.news_id for article in articles]
+            ).values_list('news_id', flat=True)) if user else set()
+        return super().to_representation(articles)
 
 
 class NewsSerializer(serializers.ModelSerializer):
+    is_liked_by_me = serializers.SerializerMethodField()
+
     class Meta:
         model = NewsArticle
-        exclude = ['full_text', 'embedding']
+        # 내부용 컬럼(view_count, comment_count, keyword_list 등)이 노출되지 않도록 필드를 명시
+        fields = ['news_id', 'title', 'author', 'link', 'summary', 'updated', 'category', 'keywords',
+                  'like_count', 'is_liked_by_me']
+        list_serializer_class = NewsListSerializer
+
+    def get_is_liked_by_me(self, obj):
+        liked_ids = self.context.get('liked_ids')
+        if liked_ids is not None:
+            return obj.news_id in liked_ids
+        user = _current_user(self)
+        return bool(user) and Like.objects.filter(news=obj, user=user).exists()
 
 
 class NewsDetailSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(source='news_id')
     
-    like_count = serializers.SerializerMethodField()
     is_liked_by_me = serializers.SerializerMethodField()
 
     class Meta:
         model = NewsArticle
-        exclude = ['summary', 'embedding']
-
-    def get_like_count(self, obj):
-        return Like.objects.filter(news=obj).count()
+        fields = ['id', 'news_id', 'title', 'author', 'link', 'updated', 'full_text', 'category', 'keywords',
+                  'like_count', 'is_liked_by_me']
 
     def get_is_liked_by_me(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Like.objects.filter(news=obj, user=request.user).exists()
-        return False
+        user = _current_user(self)
+        return bool(user) and Like.objects.filter(news=obj, user=user).exists()
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -67,3 +72,14 @@ class SearchNewsSerializer(serializers.ModelSerializer):
     class Meta:
         model = NewsArticle
         fields = ['news_id', 'title', 'summary', 'author', 'updated', 'category', 'link']
+
+
+class SearchHitSerializer(serializers.Serializer):
+    """Elasticsearch _source로 SearchNewsSerializer와 같은 형태의 응답 생성"""
+    news_id = serializers.IntegerField()
+    title = serializers.CharField()
+    summary = serializers.CharField(allow_null=True)
+    author = serializers.CharField(allow_null=True)
+    updated = serializers.DateTimeField(allow_null=True)
+    category = serializers.CharField(allow_null=True)
+    link = serializers.CharField(allow_null=True)
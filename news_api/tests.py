@@ -1,3 +1,576 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User
+from .autocomplete import PrefixIndex
+from . import chatbot
+from .digests import parse_digest, pending_articles
+from .keywords import parse_keywords
+from .counters import update_popularity_scores
+from .models import NewsArticle, ArticleNeighbor, ArticlePopularity, ArticleOutbox, SyncCheckpoint, Like, Comment, View
+from .pagination import encode_cursor, decode_cursor, keyset_condition, parse_cursor
+from .response_cache import ResponseCache
+from .search import reciprocal_rank_fusion
+from .vector_search import refresh_neighbors
+from .view_events import flush_views
+from . import views
+from .management.commands import indexing
+
+
+def create_article(**kwargs):
+    defaults = {
+        'title': '제목', 'author': '기자', 'summary': '요약', 'updated': timezone.now(),
+        'link': f"https://example.com/{NewsArticle.objects.count()}-{kwargs.get('title', '')}",
+    }
+    defaults.update(kwargs)
+    return NewsArticle.objects.create(**defaults)
+
+
+class NeighborTests(TestCase):
+    def test_refresh_trims_reverse_lists_to_k(self):
+        a = create_article(title='a', embedding=unit_vector(1.0))
+        b = create_article(title='b', embedding=unit_vector(0.9, 0.1))
+        refresh_neighbors(a, k=1)
+        refresh_neighbors(b, k=1)
+
+        # a와 같은 방향인 c가 들어오면 a의 목록은 더 가까운 c 하나만 남아야 함
+        c = create_article(title='c', embedding=unit_vector(2.0))
+        refresh_neighbors(c, k=1)
+
+        def neighbor_ids(article):
+            return list(ArticleNeighbor.objects.filter(article=article).values_list('neighbor_id', flat=True))
+
+        self.assertEqual(neighbor_ids(c), [a.pk])
+        self.assertEqual(neighbor_ids(a), [c.pk])
+        self.assertEqual(neighbor_ids(b), [a.pk])
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        updated = datetime(2025, 5, 1, 9, 30, tzinfo=dt_timezone.utc)
+        cursor = encode_cursor([updated, 42])
+        self.assertEqual(decode_cursor(cursor), [updated.isoformat(), 42])
+
+    def test_invalid_cursor_returns_none(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        self.assertIsNone(decode_cursor('!!!'))
+
+    def test_non_list_payload_returns_none(self):
+        self.assertIsNone(decode_cursor('eyJhIjogMX0='))  # {"a": 1}
+
+    def test_keyset_condition_is_lexicographic(self):
+        condition = keyset_condition(['-updated', '-news_id'], ['2025-05-01', 7])
+        expected = Q(updated__lt='2025-05-01') | (Q(news_id__lt=7) & Q(updated='2025-05-01'))
+        self.assertEqual(condition, expected)
+
+    def test_keyset_condition_ascending_field(self):
+        self.assertEqual(keyset_condition(['title'], ['a']), Q(title__gt='a'))
+
+    def test_parse_cursor_converts_values_to_field_types(self):
+        updated = datetime(2025, 5, 1, 9, 30, tzinfo=dt_timezone.utc)
+        values = parse_cursor(NewsArticle.objects.all(), ['-updated', '-pk'], encode_cursor([updated, '7']))
+        self.assertEqual(values, [updated, 7])
+
+    def test_parse_cursor_rejects_values_of_wrong_type(self):
+        queryset = NewsArticle.objects.all()
+        for payload in (['어제', 1], [None, 1], [[1], {'a': 1}], ['2025-05-01T00:00:00', 'x']):
+            with self.subTest(payload=payload), self.assertRaises(ValueError):
+                parse_cursor(queryset, ['-updated', '-pk'], encode_cursor(payload))
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        cache.clear()  # 카테고리별 총 개수 캐시
+
+    def test_news_page_follows_cursor(self):
+        articles = [create_article(title=str(i)) for i in range(13)]
+        first = self.client.get('/api/newspage/0/')
+        self.assertEqual(len(first.data['articles']), 12)
+        second = self.client.get('/api/newspage/0/', {'cursor': first.data['next_cursor']})
+        self.assertEqual([a['news_id'] for a in second.data['articles']], [articles[0].pk])
+        self.assertIsNone(second.data['next_cursor'])
+
+    def test_news_page_rejects_cursor_of_wrong_type(self):
+        create_article()
+        for payload in (['어제', 1], [{'a': 1}, [1]]):
+            with self.subTest(payload=payload):
+                response = self.client.get('/api/newspage/0/', {'cursor': encode_cursor(payload)})
+                self.assertEqual(response.status_code, 400)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.article = create_article()
+
+    def counts(self):
+        self.article.refresh_from_db(fields=['like_count', 'comment_count'])
+        return self.article.like_count, self.article.comment_count
+
+    def test_toggle_like_updates_like_count(self):
+        response = self.client.post(f'/api/like/{self.article.pk}/')
+        self.assertEqual(response.data, {"liked": True, "like_count": 1})
+        response = self.client.post(f'/api/like/{self.article.pk}/')
+        self.assertEqual(response.data, {"liked": False, "like_count": 0})
+
+    def test_unlike_already_removed_by_another_request_does_not_decrement(self):
+        self.client.post(f'/api/like/{self.article.pk}/')
+        stale = Like.objects.get(user=self.user, news=self.article)
+        NewsArticle.objects.filter(pk=self.article.pk).update(like_count=5)
+        Like.objects.filter(pk=stale.pk).delete()  # 동시에 처리된 다른 취소 요청
+
+        with mock.patch.object(Like.objects, 'get_or_create', return_value=(stale, False)):
+            self.client.post(f'/api/like/{self.article.pk}/')
+        self.assertEqual(self.counts(), (5, 0))
+
+    def test_comments_update_comment_count(self):
+        response = self.client.post(f'/api/comments/{self.article.pk}/', {'content': '댓글'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counts(), (0, 1))
+
+        comment_id = response.data['id']
+        self.assertEqual(self.client.delete(f'/api/comment/{comment_id}/').status_code, 204)
+        self.assertEqual(self.client.delete(f'/api/comment/{comment_id}/').status_code, 404)
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_comment_deleted_concurrently_does_not_decrement(self):
+        comment = Comment.objects.create(user=self.user, news=self.article, content='댓글')
+        NewsArticle.objects.filter(pk=self.article.pk).update(comment_count=3)
+        stale = Comment.objects.get(pk=comment.pk)
+        Comment.objects.filter(pk=comment.pk).delete()
+
+        with mock.patch.object(Comment.objects, 'get', return_value=stale):
+            self.assertEqual(self.client.delete(f'/api/comment/{comment.pk}/').status_code, 204)
+        self.assertEqual(self.counts(), (0, 3))
+
+
+class PopularityTests(TestCase):
+    def test_scores_are_stored_in_side_table(self):
+        quiet = create_article(title='조용한 기사', category='경제')
+        popular = create_article(title='인기 기사', category='경제', view_count=10, like_count=2)
+        create_article(title='다른 카테고리', category='정치', view_count=100)
+
+        self.assertEqual(update_popularity_scores(), 3)
+        self.assertEqual(update_popularity_scores(), 0)  # 값이 그대로면 다시 쓰지 않음
+        self.assertEqual(ArticlePopularity.objects.get(pk=popular.pk).category, '경제')
+
+        response = APIClient().get('/api/newspage/0/', {'recommend': 1, 'category': '경제'})
+        self.assertEqual([a['news_id'] for a in response.data['articles']], [popular.pk, quiet.pk])
+
+
+class RankedPageTests(TestCase):
+    def setUp(self):
+        cache.clear()  # 최신 기사 ID, 추천 순위 스냅샷
+        self.user = User.objects.create_user(username='reader', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.articles = [create_article(title=str(i)) for i in range(13)]
+
+    def page(self, **params):
+        return self.client.get('/api/newspage/0/', {'recommend': 1, **params})
+
+    def test_pages_through_snapshot_with_offset_cursor(self):
+        first = self.page()
+        self.assertEqual(len(first.data['articles']), 12)
+        self.assertEqual(first.data['next_cursor'], encode_cursor([12]))
+
+        with mock.patch.object(views, 'get_personalized_recommendations') as build:
+            second = self.page(cursor=first.data['next_cursor'])
+        build.assert_not_called()  # 두 번째 페이지는 캐시된 스냅샷에서 조회
+        self.assertEqual([a['news_id'] for a in second.data['articles']], [self.articles[0].pk])
+        self.assertIsNone(second.data['next_cursor'])
+
+    @override_settings(RANKING_SNAPSHOT_SIZE=5)
+    def test_pages_beyond_snapshot_use_live_query(self):
+        response = self.page()
+        self.assertEqual(
+            [a['news_id'] for a in response.data['articles']],
+            [article.pk for article in reversed(self.articles)][:12],
+        )
+        self.assertEqual(response.data['next_cursor'], encode_cursor([12]))
+
+    def test_rejects_invalid_offset_cursor(self):
+        for payload in (['12'], [-1], [1, 2]):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.page(cursor=encode_cursor(payload)).status_code, 400)
+
+
+class SwapAliasTests(SimpleTestCase):
+    def test_moves_alias_and_deletes_previous_index(self):
+        with mock.patch.object(indexing, 'es') as es:
+            es.indices.exists_alias.return_value = True
+            es.indices.get_alias.return_value = {'news_articles_v1': {}}
+            indexing.swap_alias('news_articles_v2', alias='news_articles')
+
+        es.indices.update_aliases.assert_called_once_with(body={"actions": [
+            {"remove": {"index": 'news_articles_v1', "alias": 'news_articles'}},
+            {"add": {"index": 'news_articles_v2', "alias": 'news_articles'}},
+        ]})
+        es.indices.delete.assert_called_once_with(index='news_articles_v1', ignore_unavailable=True)
+
+    def test_replaces_legacy_index(self):
+        with mock.patch.object(indexing, 'es') as es:
+            es.indices.exists_alias.return_value = False
+            es.indices.exists.return_value = True
+            indexing.swap_alias('news_articles_v1', alias='news_articles')
+
+        es.indices.update_aliases.assert_called_once_with(body={"actions": [
+            {"remove_index": {"index": 'news_articles'}},
+            {"add": {"index": 'news_articles_v1', "alias": 'news_articles'}},
+        ]})
+        es.indices.delete.assert_not_called()
+
+
+class OutboxTests(TestCase):
+    def test_triggers_record_changes(self):
+        article = create_article()
+        NewsArticle.objects.filter(pk=article.pk).update(view_count=5)  # 검색 문서와 무관한 컬럼
+        NewsArticle.objects.filter(pk=article.pk).update(title='새 제목')
+        NewsArticle.objects.filter(pk=article.pk).delete()
+        self.assertEqual(
+            list(ArticleOutbox.objects.order_by('id').values_list('news_id', 'operation')),
+            [(article.pk, 'upsert'), (article.pk, 'upsert'), (article.pk, 'delete')],
+        )
+
+    def test_index_changes_processes_and_deletes_rows(self):
+        kept = create_article(title='유지')
+        removed = create_article(title='삭제')
+        NewsArticle.objects.filter(pk=removed.pk).delete()
+        indexed = []
+
+        def bulk_index(queryset, *args):
+            indexed.extend(queryset.values_list('news_id', flat=True))
+            return len(indexed), set()
+
+        with mock.patch.object(indexing, 'bulk_index', side_effect=bulk_index), \
+                mock.patch.object(indexing, 'delete_documents', return_value=(1, set())) as delete_documents:
+            indexing.index_changes()
+
+        self.assertEqual(indexed, [kept.pk])
+        delete_documents.assert_called_once_with({removed.pk})
+        self.assertFalse(ArticleOutbox.objects.exists())
+        self.assertTrue(SyncCheckpoint.objects.filter(name=indexing.CHECKPOINT_NAME).exists())
+
+    def test_index_changes_keeps_rows_that_failed(self):
+        failed = create_article(title='실패')
+        indexed = create_article(title='성공')
+        removed = create_article(title='삭제')
+        NewsArticle.objects.filter(pk=removed.pk).delete()
+
+        with mock.patch.object(indexing, 'bulk_index', return_value=(1, {failed.pk})), \
+                mock.patch.object(indexing, 'delete_documents', return_value=(0, {removed.pk})):
+            indexing.index_changes()
+
+        self.assertEqual(
+            set(ArticleOutbox.objects.values_list('news_id', flat=True)),
+            {failed.pk, removed.pk},
+        )
+        self.assertFalse(ArticleOutbox.objects.filter(news_id=indexed.pk).exists())
+
+    def test_scheduled_job_survives_connection_errors(self):
+        with mock.patch.object(indexing, 'index_changes', side_effect=ConnectionError('refused')):
+            indexing.run_index_changes()
+
+
+class SearchCursorTests(SimpleTestCase):
+    def search(self, cursor):
+        request = APIRequestFactory().get('/api/search/', {'q': '경제', 'cursor': cursor})
+        return views.search_view(request)
+
+    def test_rejects_malformed_cursor(self):
+        for values in ([1.5], [1.5, 2, 3], ["a", 2], [1.5, 2.5], [True, 2]):
+            with self.subTest(values=values):
+                self.assertEqual(self.search(encode_cursor(values)).status_code, 400)
+
+
+class ReciprocalRankFusionTests(SimpleTestCase):
+    def test_items_in_both_lists_rank_first(self):
+        self.assertEqual(reciprocal_rank_fusion([1, 2, 3], [3, 4]), [3, 1, 2, 4])
+
+    def test_single_list_keeps_order(self):
+        self.assertEqual(reciprocal_rank_fusion([5, 4, 3]), [5, 4, 3])
+
+    def test_empty_lists(self):
+        self.assertEqual(reciprocal_rank_fusion([], []), [])
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = PrefixIndex({"반도체": 5, "반려동물": 9, "경제": 3}, top_k=2)
+
+    def test_completes_by_frequency(self):
+        self.assertEqual(self.index.complete("반"), ["반려동물", "반도체"])
+
+    def test_partial_jamo_query(self):
+        self.assertEqual(self.index.complete("받"), [])
+        self.assertEqual(self.index.complete("반ㄷ"), ["반도체"])
+        self.assertEqual(self.index.complete("ㄱ"), ["경제"])
+
+    def test_limit(self):
+        self.assertEqual(self.index.complete("반", limit=1), ["반려동물"])
+
+
+class ParseKeywordsTests(SimpleTestCase):
+    def test_postgres_array_string(self):
+        self.assertEqual(parse_keywords('{"AI","반도체", "A"}'), ["AI", "반도체"])
+
+    def test_list(self):
+        self.assertEqual(parse_keywords([" 경제 ", "x"], min_length=1), ["경제", "x"])
+
+    def test_empty(self):
+        self.assertEqual(parse_keywords(None), [])
+
+
+class AnalyzeNewsTests(TestCase):
+    def setUp(self):
+        cache.clear()  # 대시보드 캐시
+        self.user = User.objects.create_user(username='reader', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_aggregates_views_by_category(self):
+        for category in ('경제', '경제', '정치'):
+            View.objects.create(user=self.user, news=create_article(category=category))
+        data = self.client.get('/api/analyze/').data
+        self.assertEqual(data['user_category'], {'경제': 2, '정치': 1})
+        self.assertEqual(data['total_views'], 3)
+
+    def test_cached_until_like_changes(self):
+        article = create_article()
+        self.assertEqual(self.client.get('/api/analyze/').data['like_news'], [])
+
+        # 캐시 무효화를 거치지 않은 변경은 반영되지 않고 캐시된 결과를 쿼리 없이 반환
+        Like.objects.create(user=self.user, news=article)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/analyze/').data['like_news'], [])
+
+        # 좋아요 토글은 대시보드 캐시를 무효화
+        self.client.post(f'/api/like/{article.pk}/')
+        self.client.post(f'/api/like/{article.pk}/')
+        like_news = self.client.get('/api/analyze/').data['like_news']
+        self.assertEqual([a['news_id'] for a in like_news], [article.pk])
+
+
+class FlushViewsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pw')
+        self.article = create_article()
+
+    def test_counts_only_new_views(self):
+        self.assertEqual(flush_views([(self.user.pk, self.article.pk), (self.user.pk, self.article.pk)]), 1)
+        self.assertEqual(flush_views([(self.user.pk, self.article.pk)]), 0)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 1)
+
+    def test_skips_deleted_articles(self):
+        deleted_id = create_article(title='삭제').pk
+        NewsArticle.objects.filter(pk=deleted_id).delete()
+        self.assertEqual(flush_views([(self.user.pk, deleted_id), (self.user.pk, self.article.pk)]), 1)
+
+
+class ListQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def like(self, count):
+        for i in range(count):
+            Like.objects.create(user=self.user, news=create_article(title=str(i)))
+
+    def assert_constant_queries(self, url, params):
+        cache.clear()
+        self.like(1)
+        self.client.get(url, params)  # 총 개수 캐시 등 첫 요청에만 필요한 쿼리
+        with CaptureQueriesContext(connection) as one_article:
+            self.client.get(url, params)
+
+        self.like(4)
+        self.client.get(url, params)
+        with self.assertNumQueries(len(one_article)):
+            response = self.client.get(url, params)
+        self.assertTrue(all(a['is_liked_by_me'] for a in response.data['articles']))
+        return response
+
+    def test_news_page_is_liked_by_me_uses_one_query(self):
+        response = self.assert_constant_queries('/api/newspage/0/', {})
+        self.assertEqual(len(response.data['articles']), 5)
+
+    def test_liked_articles_is_liked_by_me_uses_one_query(self):
+        response = self.assert_constant_queries('/api/likes/', {})
+        self.assertEqual(len(response.data['articles']), 5)
+
+
+class LikedArticlesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.articles = [create_article(title=str(i)) for i in range(7)]
+        for article in self.articles:
+            Like.objects.create(user=self.user, news=article)
+
+    def ids(self, response):
+        return [a['news_id'] for a in response.data['articles']]
+
+    def test_cursor_continues_from_last_like(self):
+        newest_first = [article.pk for article in reversed(self.articles)]
+        first = self.client.get('/api/likes/')
+        self.assertEqual(self.ids(first), newest_first[:5])
+        self.assertEqual(first.data['total_pages'], 2)
+
+        # 첫 페이지를 본 뒤 좋아요가 추가돼도 다음 페이지에 중복 없이 이어짐
+        Like.objects.create(user=self.user, news=create_article(title='new'))
+        second = self.client.get('/api/likes/', {'cursor': first.data['next_cursor']})
+        self.assertEqual(self.ids(second), newest_first[5:])
+        self.assertIsNone(second.data['next_cursor'])
+
+    def test_page_number_fallback(self):
+        response = self.client.get('/api/likes/', {'page': 2})
+        self.assertEqual(self.ids(response), [self.articles[1].pk, self.articles[0].pk])
+        self.assertEqual(self.client.get('/api/likes/', {'page': 3}).status_code, 400)
+
+    def test_rejects_cursor_of_wrong_type(self):
+        response = self.client.get('/api/likes/', {'cursor': encode_cursor(['어제', 1])})
+        self.assertEqual(response.status_code, 400)
+
+
+class SseTests(SimpleTestCase):
+    def test_data_event(self):
+        self.assertEqual(views._sse({"token": "안녕"}), 'data: {"token": "안녕"}\n\n')
+
+    def test_named_event(self):
+        self.assertEqual(views._sse({"cached": True}, event='done'), 'event: done\ndata: {"cached": true}\n\n')
+
+    def test_stream_requires_authentication(self):
+        request = RequestFactory().post(
+            '/api/chatbot/stream/', data=json.dumps({"message": "안녕"}), content_type='application/json'
+        )
+        response = async_to_sync(views.chatbot_stream)(request)
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(OLLAMA_QUEUE_TIMEOUT_SECONDS=5)
+class GenerationSlotTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(chatbot, '_generation_slots', threading.BoundedSemaphore(1))
+        self.slots = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cancelled_waiter_does_not_keep_a_slot(self):
+        async def cancel_waiter():
+            self.slots.acquire()
+            waiter = asyncio.ensure_future(chatbot.aacquire_generation_slot())
+            await asyncio.sleep(0.1)
+            waiter.cancel()
+            self.slots.release()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+
+        async_to_sync(cancel_waiter)()
+        self.assertTrue(self.slots.acquire(blocking=False))
+
+    def test_waiter_gets_released_slot(self):
+        async def wait_for_release():
+            self.slots.acquire()
+            asyncio.get_running_loop().call_later(0.1, self.slots.release)
+            await chatbot.aacquire_generation_slot()
+
+        async_to_sync(wait_for_release)()
+        self.assertFalse(self.slots.acquire(blocking=False))
+
+    @override_settings(OLLAMA_QUEUE_TIMEOUT_SECONDS=0.1)
+    def test_times_out_when_no_slot_is_free(self):
+        self.slots.acquire()
+        with self.assertRaises(chatbot.ChatbotBusyError):
+            async_to_sync(chatbot.aacquire_generation_slot)()
+
+
+class ResponseCacheTests(SimpleTestCase):
+    vectors = {"주식 전망": [1.0, 0.0], "주식 전망은?": [0.99, 0.05], "날씨": [0.0, 1.0]}
+
+    def embed(self, text):
+        return self.vectors[text]
+
+    def test_exact_hit_ignores_whitespace(self):
+        responses = ResponseCache()
+        responses.set('now', 'prompt  text', 'answer')
+        self.assertEqual(responses.get('now', ' prompt text '), 'answer')
+        self.assertIsNone(responses.get('all', 'prompt text'))
+
+    def test_ttl_expiry(self):
+        responses = ResponseCache(ttl=10)
+        with mock.patch('news_api.response_cache.time.time', return_value=100):
+            responses.set('now', 'p', 'answer')
+        with mock.patch('news_api.response_cache.time.time', return_value=111):
+            self.assertIsNone(responses.get('now', 'p'))
+        self.assertEqual(responses.stats()['entries'], 0)
+
+    def test_evicts_least_recently_used(self):
+        responses = ResponseCache(max_entries=2)
+        responses.set('now', 'a', 'A')
+        responses.set('now', 'b', 'B')
+        responses.get('now', 'a')
+        responses.set('now', 'c', 'C')
+        self.assertIsNone(responses.get('now', 'b'))
+        self.assertEqual(responses.get('now', 'a'), 'A')
+
+    def test_semantic_hit(self):
+        responses = ResponseCache(semantic_modes=['none'], threshold=0.95)
+        with mock.patch('news_api.embeddings.embed_text', side_effect=self.embed):
+            responses.set('none', 'p1', 'A', message='주식 전망')
+            self.assertEqual(responses.get('none', 'p2', message='주식 전망은?'), 'A')
+            self.assertIsNone(responses.get('none', 'p3', message='날씨'))
+        stats = responses.stats()
+        self.assertEqual((stats['semantic_hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['scope'], 'process')
+
+    def test_evicted_entry_is_not_a_semantic_hit(self):
+        responses = ResponseCache(max_entries=1, semantic_modes=['none'], threshold=0.95)
+        with mock.patch('news_api.embeddings.embed_text', side_effect=self.embed):
+            responses.set('none', 'p1', 'A', message='주식 전망')
+            responses.set('none', 'p2', 'B', message='날씨')
+            self.assertIsNone(responses.get('none', 'p3', message='주식 전망은?'))
+
+
+class ParseDigestTests(SimpleTestCase):
+    def test_json_response(self):
+        content = json.dumps({"summary": " 요약 ", "key_points": ["하나", "", "둘", "셋"]})
+        self.assertEqual(parse_digest(content, 2), ("요약", ["하나", "둘"]))
+
+    def test_plain_text_is_used_as_summary(self):
+        self.assertEqual(parse_digest(" 그냥 요약 \n", 5), ("그냥 요약", []))
+
+    def test_non_object_json_is_used_as_summary(self):
+        self.assertEqual(parse_digest('["a", "b"]', 5), ('["a", "b"]', []))
+
+    def test_single_key_point_is_wrapped(self):
+        content = json.dumps({"summary": "요약", "key_points": "포인트"})
+        self.assertEqual(parse_digest(content, 5), ("요약", ["포인트"]))
+
+
+class PendingDigestTests(TestCase):
+    def test_skips_articles_without_full_text(self):
+        create_article(title='본문 없음')
+        ready = create_article(title='본문 있음', full_text='본문')
+        self.assertEqual(list(pending_articles(10)), [ready])
+
+    def test_article_is_picked_up_once_full_text_arrives(self):
+        article = create_article()
+        self.assertEqual(list(pending_articles(10)), [])
+        NewsArticle.objects.filter(pk=article.pk).update(full_text='본문')
+        self.assertEqual(list(pending_articles(10)), [article])
@@ -0,0 +1,68 @@
+import heapq
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from .models import NewsArticle, View, Like
+from .keywords import parse_keywords
+
+TRENDING_CACHE_KEY = 'trending_keywords'
+
+# 이벤트 종류별 가중치 (조회 < 신규 기사 < 좋아요)
+VIEW_WEIGHT = 1.0
+PUBLISH_WEIGHT = 2.0
+LIKE_WEIGHT = 3.0
+
+
+def _decay(timestamp, now, half_life_hours):
+    """경과 시간에 따른 반감기 가중치 (방금 발생한 이벤트 = 1.0)"""
+    age_hours = max((now - timestamp).total_seconds(), 0) / 3600.0
+    return 0.5 ** (age_hours / half_life_hours)
+
+
+def compute_trending_keywords(size=None):
+    """
+    최근 조회/좋아요/발행된 기사의 keywords를 시간 감쇠 가중치로 집계해
+    상위 size개 (키워드, 점수) 목록을 반환합니다.
+    조회/좋아요는 (기사 keyword_list, 시간) 단위로 DB에서 묶어 가져오므로 이벤트 수와 무관하게 가볍습니다.
+    """
+    size = size or getattr(settings, 'TRENDING_SIZE', 20)
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 6)
+    now = timezone.now()
+    since = now - timedelta(hours=getattr(settings, 'TRENDING_WINDOW_HOURS', 24))
+
+    scores = Counter()
+
+    def add(keyword_list, weight):
+        for keyword in parse_keywords(keyword_list):
+            scores[keyword] += weight
+
+    for model, time_field, weight in ((View, 'viewed_at', VIEW_WEIGHT), (Like, 'created_at', LIKE_WEIGHT)):
+        rows = model.objects.filter(**{f'{time_field}__gte': since}).annotate(
+            hour=TruncHour(time_field)
+        ).values('news__keyword_list', 'hour').annotate(events=Count('id')).order_by()
+        for row in rows:
+            add(row['news__keyword_list'], weight * row['events'] * _decay(row['hour'], now, half_life))
+
+    published = NewsArticle.objects.filter(updated__gte=since).values_list('keyword_list', 'updated')
+    for keyword_list, updated in published:
+        add(keyword_list, PUBLISH_WEIGHT * _decay(updated, now, half_life))
+
+    # 전체 정렬 없이 상위 size개만 유지
+    top = heapq.nlargest(size, scores.items(), key=lambda item: item[1])
+    return [(keyword, round(score, 2)) for keyword, score in top]
+
+
+def get_trending_keywords():
+    """
+    캐시된 트렌딩 키워드 목록을 반환합니다.
+    TRENDING_CACHE_SECONDS마다 한 번만 다시 집계하므로 요청당 비용은 캐시 조회 1회입니다.
+    """
+    trending = cache.get(TRENDING_CACHE_KEY)
+    if trending is None:
+        trending = compute_trending_keywords()
+        cache.set(TRENDING_CACHE_KEY, trending, getattr(settings, 'TRENDING_CACHE_SECONDS', 300))
+    return trending
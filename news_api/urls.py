@@ -14,6 +14,10 @@ urlpatterns = [
     path('newsdetail/<int:news_id>/similar/', views.similar_articles, name='similar-articles'),
     path('likes/', views.liked_articles, name='liked-articles'),
     path('search/', search_view, name='search-news'),
+    path('search/hybrid/', views.hybrid_search_view, name='search-hybrid'),
     path('autocomplete/', autocomplete_view, name='autocomplete'),
+    path('trending/', views.trending_keywords_view, name='trending-keywords'),
     path('chatbot/', views.chatbot_response, name='chatbot_response'),
+    path('chatbot/stream/', views.chatbot_stream, name='chatbot_stream'),
+    path('chatbot/cache-stats/', views.chatbot_cache_stats, name='chatbot_cache_stats'),
 ]
\ No newline at end of file
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection, transaction
+from pgvector.django import CosineDistance
+from .models import NewsArticle, ArticleNeighbor
+
+
+# 기사별 이웃 목록을 거리순으로 k개만 남기고 나머지를 한 번에 삭제
+TRIM_NEIGHBORS_SQL = """
+    DELETE FROM news_api_articleneighbor
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (PARTITION BY article_id ORDER BY distance, id) AS rank
+            FROM news_api_articleneighbor
+            WHERE article_id = ANY(%s)
+        ) AS ranked
+        WHERE rank > %s
+    )
+"""
+
+
+@contextmanager
+def ann_search():
+    """ANN 인덱스 검색 파라미터(ef_search, probes)를 적용한 트랜잭션 블록"""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # SET LOCAL은 현재 트랜잭션에만 적용됨
+            cursor.execute(
+                "SET LOCAL hnsw.ef_search = %s",
+                [int(getattr(settings, 'PGVECTOR_HNSW_EF_SEARCH', 40))]
+            )
+            cursor.execute(
+                "SET LOCAL ivfflat.probes = %s",
+                [int(getattr(settings, 'PGVECTOR_IVFFLAT_PROBES', 1))]
+            )
+        yield
+
+
+def nearest_articles(vector, k, exclude_ids=None, queryset=None):
+    """
+    embedding과 코사인 거리가 가까운 기사 k개를 ANN 인덱스로 조회합니다.
+    결과 기사에는 distance 값이 annotate 되어 있습니다.
+    """
+    if queryset is None:
+        queryset = NewsArticle.objects.all()
+    if exclude_ids:
+        queryset = queryset.exclude(news_id__in=exclude_ids)
+
+    queryset = queryset.exclude(embedding__isnull=True).annotate(
+        distance=CosineDistance("embedding", vector)
+    ).order_by("distance")[:k]
+
+    # 파라미터가 적용된 트랜잭션 안에서 평가해야 하므로 list로 변환
+    with ann_search():
+        return list(queryset)
+
+
+def refresh_neighbors(article, k=None):
+    """
+    기사 하나의 top-K 이웃 목록을 다시 계산합니다.
+    새 기사가 기존 기사들의 top-K 안에 들어가는 경우 해당 목록에도 반영합니다.
+    """
+    if article.embedding is None:
+        return 0
+
+    k = k or getattr(settings, 'SIMILAR_ARTICLES_TOP_K', 20)
+    neighbors = nearest_articles(
+        article.embedding, k,
+        exclude_ids=[article.news_id],
+        queryset=NewsArticle.objects.only('news_id'),
+    )
+
+    with transaction.atomic():
+        # 1. 현재 기사의 이웃 목록 교체
+        ArticleNeighbor.objects.filter(article=article).delete()
+        ArticleNeighbor.objects.bulk_create([
+            ArticleNeighbor(article=article, neighbor=neighbor, distance=neighbor.distance)
+            for neighbor in neighbors
+        ])
+
+        # 2. 역방향 갱신: 이웃 기사들의 목록에 현재 기사 추가 후 k개로 자르기
+        ArticleNeighbor.objects.bulk_create([
+            ArticleNeighbor(article=neighbor, neighbor=article, distance=neighbor.distance)
+            for neighbor in neighbors
+        ], ignore_conflicts=True)
+
+        if neighbors:
+            with connection.cursor() as cursor:
+                cursor.execute(TRIM_NEIGHBORS_SQL, [[neighbor.news_id for neighbor in neighbors], k])
+
+    return len(neighbors)
@@ -0,0 +1,126 @@
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.db import connection, transaction
+from .counters import increment_counter
+from .caching import invalidate_dashboard
+
+# 요청 스레드가 넣고 백그라운드 워커가 꺼내는 조회 이벤트 (user_id, news_id)
+_events = queue.Queue(maxsize=getattr(settings, 'VIEW_EVENT_QUEUE_SIZE', 10000))
+_worker = None
+_lock = threading.Lock()
+
+# 조회 기록을 한 번에 넣고 실제로 저장된 행만 반환
+# (이미 있는 조합은 ON CONFLICT로 건너뛰고, 그사이 삭제된 기사는 JOIN으로 제외)
+INSERT_VIEWS_SQL = """
+    INSERT INTO news_api_view (user_id, news_id, viewed_at)
+    SELECT e.user_id, e.news_id, now()
+    FROM unnest(%s::integer[], %s::integer[]) AS e(user_id, news_id)
+    JOIN news_api_newsarticle AS a ON a.news_id = e.news_id
+    ON CONFLICT (user_id, news_id) DO NOTHING
+    RETURNING user_id, news_id
+"""
+
+
+def flush_views(events):
+    """
+    조회 이벤트 묶음을 한 번에 저장합니다.
+    실제로 새로 저장된 (사용자, 기사) 조합만 view_count에 반영합니다.
+    """
+    pairs = set(events)
+    if not pairs:
+        return 0
+
+    user_ids, news_ids = zip(*pairs)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(INSERT_VIEWS_SQL, [list(user_ids), list(news_ids)])
+            new_pairs = cursor.fetchall()
+        for news_id, count in Counter(news_id for _, news_id in new_pairs).items():
+            increment_counter(news_id, 'view_count', count)
+
+    for user_id in {user_id for user_id, _ in new_pairs}:
+        invalidate_dashboard(user_id)
+    return len(new_pairs)
+
+
+def _drain(limit):
+    """큐에 쌓인 이벤트를 최대 limit개까지 꺼냅니다."""
+    events = []
+    while len(events) < limit:
+        try:
+            events.append(_events.get_nowait())
+        except queue.Empty:
+            break
+    return events
+
+
+def _flush_with_retry(events):
+    """
+    flush_views를 실패 시 VIEW_EVENT_MAX_RETRIES번까지 간격을 늘려가며 재시도합니다.
+    끝내 실패한 묶음은 버린 이벤트 수를 로그로 남깁니다.
+    """
+    retries = getattr(settings, 'VIEW_EVENT_MAX_RETRIES', 3)
+    delay = getattr(settings, 'VIEW_EVENT_RETRY_SECONDS', 1)
+    for attempt in range(retries + 1):
+        try:
+            return flush_views(events)
+        except Exception as e:
+            connection.close()  # 끊어진 연결이 원인일 수 있으므로 다음 시도는 새 연결로
+            if attempt == retries:
+                print(f"View event flush error: {e} ({len(events)}개 이벤트 저장 실패, 폐기)")
+                return 0
+            print(f"View event flush error: {e} ({attempt + 1}/{retries}회 재시도)")
+            time.sleep(delay * 2 ** attempt)
+
+
+def _run():
+    batch_size = getattr(settings, 'VIEW_EVENT_BATCH_SIZE', 500)
+    interval = getattr(settings, 'VIEW_EVENT_FLUSH_SECONDS', 2)
+    while True:
+        try:
+            # 첫 이벤트를 기다린 뒤 interval 동안 쌓인 이벤트를 batch_size씩 묶어서 저장
+            first = _events.get()
+            time.sleep(interval)
+            events = [first] + _drain(batch_size - 1)
+            while events:
+                _flush_with_retry(events)
+                events = _drain(batch_size)
+        finally:
+            connection.close()  # 워커 스레드의 DB 연결 정리
+
+
+def _ensure_worker():
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='view-event-writer', daemon=True)
+            _worker.start()
+
+
+def record_view(user_id, news_id):
+    """
+    기사 조회를 기록합니다.
+    요청 경로에서는 큐에 넣기만 하고 저장은 백그라운드 워커가 묶어서 처리합니다.
+    (VIEW_EVENT_ASYNC가 꺼져 있거나 큐가 가득 차면 바로 저장)
+    """
+    if not getattr(settings, 'VIEW_EVENT_ASYNC', True):
+        flush_views([(user_id, news_id)])
+        return
+
+    try:
+        _events.put_nowait((user_id, news_id))
+    except queue.Full:
+        flush_views([(user_id, news_id)])
+        return
+    _ensure_worker()
+
+
+@atexit.register
+def _flush_pending():
+    """프로세스 종료 시 남은 이벤트 저장"""
+    while not _events.empty():
+        _flush_with_retry(_drain(getattr(settings, 'VIEW_EVENT_BATCH_SIZE', 500)))
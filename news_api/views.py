@@ -1,19 +1,39 @@
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from .models import NewsArticle, View, Like, Comment
-from .serializers import NewsSerializer, NewsDetailSerializer, CommentSerializer, NewsArticleIndex, SearchNewsSerializer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.exceptions import AuthenticationFailed
+from .models import NewsArticle, View, Like, Comment, ArticleNeighbor
+from .serializers import NewsSerializer, NewsDetailSerializer, CommentSerializer, NewsArticleIndex, SearchNewsSerializer, SearchHitSerializer
+from .search import (
+    SEARCH_SOURCE_FIELDS, hits_to_dicts, articles_in_hit_order,
+    keyword_query, apply_search_filters, parse_track_total_hits, hybrid_search,
+)
+from .vector_search import nearest_articles
+from .pagination import keyset_page, encode_cursor, decode_cursor
+from .caching import cached_total_count, dashboard_cache_key, invalidate_dashboard
+from .autocomplete import POPULAR_KEYWORDS, complete, matches_partial_hangul
+from .counters import increment_counter
+from .view_events import record_view
+from .trending import get_trending_keywords
+from .keywords import top_keywords
+from .recommendations import get_taste_profile, refresh_taste_profile, ranked_page
 from datetime import timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from collections import Counter
 from pgvector.django import CosineDistance
 from django.views.decorators.cache import never_cache
-from django.core.paginator import Paginator
-from elasticsearch_dsl import Q
 from django.conf import settings # settings.py에서 Ollama 모델 설정을 가져오기 위해
-from django.db.models import Avg, Case, When, Value, FloatField, F
-import numpy as np
+from django.db.models import Avg, Case, When, Value, FloatField, F, Count
+from django.db.models.functions import TruncDate
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+import json
 
 @api_view(['POST'])
 def chatbot_response(request):
@@ -48,12 +68,104 @@ def chatbot_response(request):
         return Response({"error": "An unexpected error occurred."}, status=500)
 
 
+def _authenticate(request):
+    """
+    DRF 인증 클래스(Basic/Token)로 요청 사용자를 확인합니다.
+    인증 정보가 없으면 None, 잘못된 인증 정보면 AuthenticationFailed를 발생시킵니다.
+    """
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    user = drf_request.user
+    return user if user.is_authenticated else None
+
+
+def _sse(data, event=None):
+    """server-sent event 한 건을 문자열로 변환"""
+    payload = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return f"event: {event}\n{payload}" if event else payload
+
+
+async def chatbot_stream(request):
+    """
+    챗봇 응답을 server-sent events로 토큰 단위 스트리밍합니다. (ASGI 서버에서 실행)
+    요청 본문과 인증 요구사항은 /api/chatbot/과 같고, 토큰은 data 이벤트로, 종료/오류는 done/error 이벤트로 전달합니다.
+    """
+    from .chatbot import AsyncChatbotService, ChatbotBusyError, ollama_error_message
+    from .response_cache import response_cache
+
+    if request.method != 'POST':
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+
+    try:
+        body = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON body."}, status=400)
+
+    message = body.get('message')
+    context = body.get('context', '')
+    mode = body.get('mode', 'none')  # 'none', 'now', 'all'
+
+    if not message:
+        return JsonResponse({"error": "Message is required."}, status=400)
+
+    if mode not in ['none', 'now', 'all']:
+        return JsonResponse({"error": "Invalid mode. Use 'none', 'now', or 'all'."}, status=400)
+
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({"error": str(e.detail)}, status=401)
+    if user is None:
+        # /api/chatbot/과 같이 인증된 사용자만 허용 (DRF 기본 IsAuthenticated)
+        return JsonResponse({"error": "Authentication credentials were not provided."}, status=401)
+
+    service = AsyncChatbotService(user=user, mode=mode)
+    try:
+        # 컨텍스트 분석/RAG 검색 등 DB 작업은 스레드에서 실행
+        prompt = await sync_to_async(service.build_prompt)(message, context)
+    except Exception as e:
+        print(f"Chatbot Error: {e}")
+        return JsonResponse({"error": "An unexpected error occurred."}, status=500)
+
+    cache_text = service.cache_text or prompt
+    cached = await sync_to_async(response_cache.get, thread_sensitive=False)(mode, cache_text, message)
+
+    async def events():
+        if cached is not None:
+            # 캐시된 응답은 한 번에 전달
+            yield _sse({"token": cached})
+            yield _sse({"cached": True}, event='done')
+            return
+
+        tokens = []
+        try:
+            async for token in service.stream_ollama_response(prompt):
+                tokens.append(token)
+                yield _sse({"token": token})
+            yield _sse({}, event='done')
+            answer = ''.join(tokens).strip()
+            if answer:
+                await sync_to_async(response_cache.set, thread_sensitive=False)(mode, cache_text, answer, message)
+        except ChatbotBusyError as e:
+            yield _sse({"error": str(e)}, event='error')
+        except Exception as e:
+            print(f"Ollama Stream Error: {e}")
+            yield _sse({"error": ollama_error_message(e)}, event='error')
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # 프록시 버퍼링 없이 바로 전달
+    return response
+
+# async view에는 csrf_exempt 데코레이터 대신 속성으로 지정 (토큰/Basic 인증 API)
+chatbot_stream.csrf_exempt = True
+
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def similar_articles(request, news_id):
     try:
-        target_article = NewsArticle.objects.get(pk=news_id)
+        target_article = NewsArticle.objects.only('news_id', 'embedding').get(pk=news_id)
     except NewsArticle.DoesNotExist:
         return Response({"error": "News not found"}, status=404)
 
@@ -61,11 +173,19 @@ def similar_articles(request, news_id):
     if target_article.embedding is None:
         return Response({"error": "No embedding for target article"}, status=400)
 
-    queryset = NewsArticle.objects.exclude(pk=news_id)
-    queryset = queryset.annotate(similarity=CosineDistance("embedding", target_article.embedding))
-    queryset = queryset.order_by("similarity")[:5]
+    # 1. 사전 계산된 이웃 목록 조회 (인덱스 조회 1회)
+    neighbors = ArticleNeighbor.objects.filter(
+        article_id=news_id
+    ).select_related('neighbor').defer(
+        'neighbor__full_text', 'neighbor__embedding'
+    ).order_by('distance')[:5]
+    articles = [n.neighbor for n in neighbors]
 
-    serializer = NewsSerializer(queryset, many=True)
+    # 2. 아직 계산되지 않은 기사는 ANN 인덱스로 실시간 조회
+    if not articles:
+        articles = nearest_articles(target_article.embedding, 5, exclude_ids=[news_id])
+
+    serializer = NewsSerializer(articles, many=True, context={'request': request})
     return Response(serializer.data, status=200)
 
 
@@ -78,59 +198,31 @@ VALID_CATEGORIES = [
 def get_personalized_recommendations(user, queryset):
     """
     사용자의 좋아요 기록을 기반으로 개인 맞춤형 추천을 생성합니다.
+    취향 벡터는 좋아요 변경 시 계산되어 캐시/DB에 저장된 값을 사용합니다.
     """
     try:
-        # 1. 사용자의 최근 좋아요 기사 10개 가져오기
-        recent_likes = Like.objects.filter(user=user).select_related('news').order_by('-created_at')[:10]
+        # 1. 캐시된 사용자 취향 프로필 가져오기 (최근 좋아요 10개 기준)
+        profile = get_taste_profile(user)
         
-        if not recent_likes.exists():
+        if not profile['liked_ids']:
             # 좋아요한 기사가 없으면 최신순으로 반환
             return queryset.order_by('-updated')
         
-        # 2. 좋아요한 기사들의 embedding 가져오기 (최신 좋아요에 더 높은 가중치)
-        liked_articles = [like.news for like in recent_likes]
-        liked_embeddings = []
-        embedding_weights = []
-        
-        for i, article in enumerate(liked_articles):
-            if article.embedding is not None:
-                # embedding이 list인 경우와 numpy array인 경우 모두 처리
-                if isinstance(article.embedding, list):
-                    liked_embeddings.append(np.array(article.embedding))
-                else:
-                    liked_embeddings.append(article.embedding)
-                
-                # 최신 좋아요일수록 높은 가중치 (첫 번째가 가장 최신)
-                weight = 1.0 - (i * 0.1)  # 1.0, 0.9, 0.8, ..., 0.1
-                embedding_weights.append(max(weight, 0.1))  # 최소 0.1
+        avg_embedding = profile['embedding']
+        top_categories = profile['top_categories']
         
-        if not liked_embeddings:
+        if avg_embedding is None:
             # embedding이 없으면 카테고리/키워드 기반 추천
-            return get_category_based_recommendations(user, queryset, liked_articles)
+            return get_category_based_recommendations(user, queryset, top_categories)
         
-        # 3. 좋아요한 기사들의 가중평균 embedding 계산
-        liked_embeddings = np.array(liked_embeddings)
-        embedding_weights = np.array(embedding_weights)
+        # 2. 좋아요한 기사들은 제외
+        filtered_queryset = queryset.exclude(news_id__in=profile['liked_ids'])
         
-        # 가중평균 계산
-        avg_embedding = np.average(liked_embeddings, axis=0, weights=embedding_weights)
-        
-        # 4. 좋아요한 기사들은 제외
-        liked_ids = [article.news_id for article in liked_articles]
-        filtered_queryset = queryset.exclude(news_id__in=liked_ids)
-        
-        # 5. embedding이 없는 기사들 제외
+        # 3. embedding이 없는 기사들 제외
         filtered_queryset = filtered_queryset.exclude(embedding__isnull=True)
         
-        # 6. 유사도 계산 및 카테고리 다양성 고려
+        # 4. 유사도와 카테고리 선호도를 종합한 점수 계산
         # CosineDistance를 사용하여 유사도 계산 (거리가 작을수록 유사함)
-        
-        # 사용자가 좋아요한 카테고리들
-        liked_categories = [article.category for article in liked_articles if article.category]
-        category_counts = Counter(liked_categories)
-        top_categories = [cat for cat, _ in category_counts.most_common(3)]
-        
-        # 유사도와 카테고리 선호도를 종합한 점수 계산
         annotated_queryset = filtered_queryset.annotate(
             similarity_score=CosineDistance("embedding", avg_embedding),
             # 선호 카테고리 보너스
@@ -150,24 +242,18 @@ def get_personalized_recommendations(user, queryset):
         # 오류 발생시 기본 추천 로직 사용
         return get_fallback_recommendations(user, queryset)
 
-def get_category_based_recommendations(user, queryset, liked_articles):
+def get_category_based_recommendations(user, queryset, top_categories):
     """
-    embedding이 없을 때 카테고리와 키워드 기반 추천
+    embedding이 없을 때 카테고리 기반 추천
+    top_categories: 좋아요한 기사들의 상위 카테고리 (많이 좋아요한 순)
     """
     try:
-        # 좋아요한 기사들의 카테고리 빈도 계산
-        categories = [article.category for article in liked_articles if article.category]
-        category_counts = Counter(categories)
-        
-        if not category_counts:
+        if not top_categories:
             return queryset.order_by('-updated')
         
-        # 가장 많이 좋아요한 카테고리 순으로 가중치 부여
-        most_liked_categories = [cat for cat, _ in category_counts.most_common(3)]
-        
         # Case When을 사용하여 선호 카테고리에 우선순위 부여
         category_priority = Case(
-            *[When(category=cat, then=Value(i)) for i, cat in enumerate(most_liked_categories)],
+            *[When(category=cat, then=Value(i)) for i, cat in enumerate(top_categories)],
             default=Value(999),
             output_field=FloatField()
         )
@@ -204,39 +290,19 @@ def get_fallback_recommendations(user, queryset):
         print(f"Fallback recommendation error: {e}")
         return queryset.order_by('-updated')
 
-def get_popularity_based_recommendations(queryset):
+def get_popularity_based_recommendations(queryset, category=None):
     """
     비로그인 사용자를 위한 인기도 기반 추천
-    조회수, 좋아요 수, 최신성을 종합적으로 고려
+    조회수, 좋아요 수, 최신성을 종합한 ArticlePopularity.score(score_popularity 명령으로 사전 계산) 순
+    (점수가 아직 계산되지 않은 새 기사는 다음 계산 주기부터 포함)
     """
-    try:
-        from django.db.models import Count, F
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # 최근 7일 내 기사들에 더 높은 가중치
-        recent_date = timezone.now() - timedelta(days=7)
-        
-        # 조회수와 좋아요 수를 기반으로 인기도 점수 계산
-        popularity_queryset = queryset.annotate(
-            view_count=Count('view', distinct=True),
-            like_count=Count('like', distinct=True),
-            # 최신성 가중치 (최근 7일 내 기사는 점수 증가)
-            recency_bonus=Case(
-                When(updated__gte=recent_date, then=Value(10)),
-                default=Value(0),
-                output_field=FloatField()
-            ),
-            # 전체 인기도 점수 계산 (조회수 * 1 + 좋아요 * 3 + 최신성 보너스)
-            popularity_score=F('view_count') + F('like_count') * 3 + F('recency_bonus')
-        ).order_by('-popularity_score', '-updated')
-        
-        return popularity_queryset
-        
-    except Exception as e:
-        print(f"Popularity-based recommendation error: {e}")
-        # 오류 발생시 최신순으로 대체
-        return queryset.order_by('-updated')
+    queryset = queryset.filter(popularity__isnull=False)
+    if category:
+        # (category, score) 인덱스로 조회하도록 인기도 테이블의 카테고리로도 필터
+        queryset = queryset.filter(popularity__category=category)
+    return queryset.annotate(
+        popularity_score=F('popularity__score')
+    ).order_by('-popularity_score', '-news_id')
 
 # Create your views here.
 @api_view(['GET'])
@@ -256,38 +322,66 @@ def protected_view(request):
 def news_page(request, page_num):
     category = request.GET.get('category', '').strip()
     recommend = int(request.GET.get('recommend', 0))
+    cursor = request.GET.get('cursor')  # 다음 페이지 커서 (있으면 page_num 대신 사용)
     page_size = 12
 
     if category in ('전체', '', 'all', None):
         queryset = NewsArticle.objects.all()
+        count_scope = 'all'
     elif category in VALID_CATEGORIES:
         queryset = NewsArticle.objects.filter(category=category)
+        count_scope = category
     else:
         return Response({"error": "Invalid category"}, status=400)
 
+    total_count = cached_total_count(queryset, count_scope)  # 총 개수 (캐시)
+    queryset = queryset.defer('full_text', 'embedding')  # 목록 응답에 쓰이지 않는 큰 컬럼 제외
+
     if recommend == 0:
         # 최신순 정렬
         queryset = queryset.order_by('-updated')
     elif recommend == 1:
         # 개인 맞춤형 추천
         if request.user.is_authenticated:
-            # 로그인한 사용자: 좋아요 기반 개인 맞춤 추천
-            queryset = get_personalized_recommendations(request.user, queryset)
+            # 로그인한 사용자: 좋아요 기반 개인 맞춤 추천 (순위 스냅샷에서 페이지 조회)
+            offset = page_num * page_size
+            if cursor:
+                values = decode_cursor(cursor)
+                if not values or len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+                    return Response({"error": "Invalid cursor"}, status=400)
+                offset = values[0]
+
+            news_list, next_offset = ranked_page(
+                request.user, count_scope,
+                lambda: get_personalized_recommendations(request.user, queryset),
+                page_size, offset
+            )
+            serializer = NewsSerializer(news_list, many=True, context={'request': request})
+            return Response({
+                "total_count": total_count,
+                "articles": serializer.data,
+                "next_cursor": encode_cursor([next_offset]) if next_offset is not None else None,
+            })
         else:
             # 비로그인 사용자: 인기도 기반 추천 (조회수, 좋아요 수 등을 고려)
-            queryset = get_popularity_based_recommendations(queryset)
+            queryset = get_popularity_based_recommendations(
+                queryset, None if count_scope == 'all' else count_scope
+            )
     else:
         return Response({"error": "Invalid recommend flag (0 or 1 only)"}, status=400)
 
-    total_count = queryset.count()  # 총 개수 추가
-    start = page_num * page_size
-    end = start + page_size
-    news_list = queryset[start:end]
+    try:
+        news_list, next_cursor = keyset_page(
+            queryset, page_size, cursor=cursor, offset=page_num * page_size
+        )
+    except ValueError:
+        return Response({"error": "Invalid cursor"}, status=400)
 
-    serializer = NewsSerializer(news_list, many=True)
+    serializer = NewsSerializer(news_list, many=True, context={'request': request})
     return Response({
         "total_count": total_count,
-        "articles": serializer.data
+        "articles": serializer.data,
+        "next_cursor": next_cursor,
     })
 
 
@@ -303,7 +397,8 @@ def news_detail(request, news_id):
         return Response({"error": "News not found"}, status=status.HTTP_404_NOT_FOUND)
 
     if request.user.is_authenticated:
-        View.objects.get_or_create(user=request.user, news=article)
+        # 조회 기록은 큐에 넣고 백그라운드에서 묶어서 저장 (응답을 기다리게 하지 않음)
+        record_view(request.user.pk, article.news_id)
 
     serializer = NewsDetailSerializer(article, context={'request': request})  # ✅ context 추가
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -333,11 +428,13 @@ def comments_view(request, news_id):
     if not content:
         return Response({"error": "Comment content is required"}, status=400)
 
-    comment = Comment.objects.create(
-        user=request.user,
-        news=article,
-        content=content
-    )
+    with transaction.atomic():
+        comment = Comment.objects.create(
+            user=request.user,
+            news=article,
+            content=content
+        )
+        increment_counter(article.news_id, 'comment_count')
     return Response(CommentSerializer(comment).data, status=201)
 
 
@@ -362,7 +459,11 @@ def comment_detail_view(request, comment_id):
         return Response(CommentSerializer(comment).data, status=200)
 
     elif request.method == 'DELETE':
-        comment.delete()
+        with transaction.atomic():
+            # 동시에 삭제 요청이 와도 실제로 지운 요청만 카운터를 줄임
+            deleted, _ = comment.delete()
+            if deleted:
+                increment_counter(comment.news_id, 'comment_count', -1)
         return Response({"message": "Comment deleted"}, status=204)
     
 
@@ -370,43 +471,58 @@ def comment_detail_view(request, comment_id):
 @permission_classes([IsAuthenticated])
 def analyze_news(request):
     user = request.user
-    views = View.objects.filter(user=user).select_related('news')
-
-    # 1. 카테고리 통계
-    category_counter = Counter(view.news.category for view in views if view.news.category)
-    user_category = dict(category_counter)
-
-    # 2. 키워드 통계 (10개까지)
-    keyword_list = []
-    for view in views:
-        if view.news.keywords:
-            cleaned = view.news.keywords.replace('{', '').replace('}', '').replace('"', '')
-            keyword_list += [k.strip() for k in cleaned.split(',') if k.strip()]
-    keyword_counter = Counter(keyword_list).most_common(10)
+    now = timezone.now()
+    today = now.date()
+
+    # 조회/좋아요가 바뀌기 전까지는 캐시된 결과 사용
+    cache_key = dashboard_cache_key(user.pk, today)
+    data = cache.get(cache_key)
+    if data is not None:
+        return Response(data, status=status.HTTP_200_OK)
+
+    views = View.objects.filter(user=user)
+
+    # 1. 카테고리 통계 (DB에서 GROUP BY)
+    category_rows = views.exclude(news__category__isnull=True).exclude(news__category='').values(
+        'news__category'
+    ).annotate(count=Count('id')).order_by('-count')
+    user_category = {row['news__category']: row['count'] for row in category_rows}
+
+    # 2. 키워드 통계 (10개까지, keyword_list를 DB에서 집계)
+    keyword_counter = top_keywords(views.values('news_id'), 10)
     user_keyword = [{"keyword": k, "count": c} for k, c in keyword_counter]
 
-    # 3. 최근 7일 조회수
-    today = timezone.now().date()
+    # 3. 최근 7일 조회수 (일자별 GROUP BY 한 번으로 조회)
     last_7_days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+    week_start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=6)
+    daily_counts = dict(
+        views.filter(viewed_at__gte=week_start).annotate(
+            day=TruncDate('viewed_at')
+        ).values('day').annotate(count=Count('id')).values_list('day', 'count')
+    )
     week_view = [
-        {"date": day.strftime("%Y-%m-%d"), "count": views.filter(viewed_at__date=day).count()}
+        {"date": day.strftime("%Y-%m-%d"), "count": daily_counts.get(day, 0)}
         for day in last_7_days
     ]
 
     # 4. 좋아요한 뉴스 5개 (최신순)
-    liked = Like.objects.filter(user=user).select_related('news').order_by('-created_at')[:5]
+    liked = Like.objects.filter(user=user).select_related('news').defer(
+        'news__full_text', 'news__embedding'
+    ).order_by('-created_at')[:5]
     liked_news = [like.news for like in liked]
-    like_news = NewsSerializer(liked_news, many=True).data
+    like_news = NewsSerializer(liked_news, many=True, context={'request': request}).data
 
     total_views = views.count()
-    
-    return Response({
+
+    data = {
         "user_category": user_category,
         "user_keyword": user_keyword,
         "week_view": week_view,
         "like_news": like_news,
         "total_views": total_views,  # ✅ 여기에 추가
-    }, status=status.HTTP_200_OK)
+    }
+    cache.set(cache_key, data, getattr(settings, 'DASHBOARD_CACHE_SECONDS', 600))
+    return Response(data, status=status.HTTP_200_OK)
 
     
     
@@ -419,16 +535,28 @@ def toggle_like(request, news_id):
         return Response({"error": "News not found"}, status=status.HTTP_404_NOT_FOUND)
 
     user = request.user
-    like, created = Like.objects.get_or_create(user=user, news=article)
+    with transaction.atomic():
+        like, created = Like.objects.get_or_create(user=user, news=article)
+
+        if not created:
+            # 이미 좋아요 되어 있으면 삭제 (동시 요청 중 실제로 지운 요청만 카운터를 줄임)
+            deleted, _ = like.delete()
+            liked = False
+            if deleted:
+                increment_counter(article.news_id, 'like_count', -1)
+        else:
+            liked = True
+            increment_counter(article.news_id, 'like_count', 1)
 
-    if not created:
-        # 이미 좋아요 되어 있으면 삭제
-        like.delete()
-        liked = False
-    else:
-        liked = True
+    # 좋아요가 바뀌었으므로 분석 대시보드 캐시 무효화 및 취향 벡터 갱신
+    invalidate_dashboard(user.pk)
+    try:
+        refresh_taste_profile(user)
+    except Exception as e:
+        print(f"Taste profile refresh error: {e}")
 
-    like_count = Like.objects.filter(news=article).count()
+    article.refresh_from_db(fields=['like_count'])
+    like_count = article.like_count
 
     return Response({
         "liked": liked,
@@ -441,26 +569,52 @@ def toggle_like(request, news_id):
 def liked_articles(request):
     user = request.user
     page = int(request.GET.get('page', 1))
+    cursor = request.GET.get('cursor')  # 다음 페이지 커서 (있으면 page 대신 사용)
     per_page = 5
 
-    likes = Like.objects.filter(user=user).select_related('news').order_by('-created_at')
-    news_list = [like.news for like in likes]
-
-    paginator = Paginator(news_list, per_page)
-    if page > paginator.num_pages or page < 1:
+    likes = Like.objects.filter(user=user)
+    total_count = likes.count()  # (user, created_at) 인덱스만 조회
+    total_pages = max((total_count + per_page - 1) // per_page, 1)
+    if page > total_pages or page < 1:
         return Response({"error": "Invalid page number"}, status=400)
 
-    page_obj = paginator.page(page)
-    serializer = NewsSerializer(page_obj.object_list, many=True)
+    # 한 페이지 분량만 DB에서 가져옴 (좋아요 최신순, 목록에 쓰이지 않는 큰 컬럼 제외)
+    likes = likes.select_related('news').defer(
+        'news__full_text', 'news__embedding'
+    ).order_by('-created_at')
+    try:
+        page_likes, next_cursor = keyset_page(
+            likes, per_page, cursor=cursor, offset=(page - 1) * per_page
+        )
+    except ValueError:
+        return Response({"error": "Invalid cursor"}, status=400)
+
+    news_list = [like.news for like in page_likes]
+    serializer = NewsSerializer(news_list, many=True, context={'request': request})
 
     return Response({
-        "total_count": paginator.count,
-        "total_pages": paginator.num_pages,
+        "total_count": total_count,
+        "total_pages": total_pages,
         "page": page,
         "articles": serializer.data,
+        "next_cursor": next_cursor,
     }, status=status.HTTP_200_OK)
     
     
+def parse_search_filters(request):
+    """검색 필터 파라미터 검증 (filters, 오류 메시지) 반환"""
+    category = request.GET.get('category', '').strip()
+    if category and category not in VALID_CATEGORIES:
+        return None, "Invalid category"
+
+    date_from = request.GET.get('date_from', '').strip()
+    date_to = request.GET.get('date_to', '').strip()
+    if (date_from and not parse_date(date_from)) or (date_to and not parse_date(date_to)):
+        return None, "Invalid date (YYYY-MM-DD)"
+
+    return {"category": category, "date_from": date_from, "date_to": date_to}, None
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search_view(request):
@@ -468,192 +622,122 @@ def search_view(request):
     if not query:
         return Response({"error": "검색어가 비어있습니다."}, status=400)
 
-    q = Q("multi_match", 
-        query=query,
-        fields=["title^2", "summary"],  # title에 가중치
-        fuzziness="AUTO"  # 유사 검색 허용
-    )
-    s = NewsArticleIndex.search().query(q)[:20]
-    results = s.execute()
+    filters, error = parse_search_filters(request)
+    if error:
+        return Response({"error": error}, status=400)
+
+    try:
+        size = min(max(int(request.GET.get('size', 20)), 1), 50)
+        track_total_hits = parse_track_total_hits(request.GET.get('track_total_hits'))
+    except ValueError:
+        return Response({"error": "Invalid size or track_total_hits"}, status=400)
+
+    s = NewsArticleIndex.search().query(keyword_query(query))
+    s = apply_search_filters(s, **filters)
+    # search_after 페이지네이션을 위해 점수 + news_id로 정렬 순서를 고정
+    s = s.sort('_score', {'news_id': {'order': 'desc'}})[:size]
+    if track_total_hits is not None:
+        s = s.extra(track_total_hits=track_total_hits)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        # 커서는 정렬 키와 같은 [점수, news_id] 형태여야 함
+        search_after = decode_cursor(cursor)
+        if (
+            not search_after or len(search_after) != 2
+            or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in search_after)
+            or not isinstance(search_after[1], int)
+        ):
+            return Response({"error": "Invalid cursor"}, status=400)
+        s = s.extra(search_after=search_after)
+
+    try:
+        if getattr(settings, 'SEARCH_SERVE_FROM_SOURCE', True):
+            # 색인된 _source만으로 응답 (DB 조회 없음)
+            results = s.source(SEARCH_SOURCE_FIELDS).execute()
+            serializer = SearchHitSerializer(hits_to_dicts(results), many=True)
+        else:
+            # DB에서 가져오되 검색 순위 유지
+            results = s.source(False).execute()
+            ids = [int(hit.meta.id) for hit in results]
+            serializer = SearchNewsSerializer(articles_in_hit_order(ids), many=True)
+    except Exception as e:
+        print(f"Search error: {e}")
+        return Response({"error": "검색 중 오류가 발생했습니다."}, status=503)
+
+    total = getattr(results.hits, 'total', None)
+    next_cursor = None
+    if len(results.hits) == size:
+        next_cursor = encode_cursor(list(results.hits[-1].meta.sort))
 
-    ids = [int(hit.meta.id) for hit in results]
-    articles = NewsArticle.objects.filter(news_id__in=ids)
-    serializer = SearchNewsSerializer(articles, many=True)
     return Response({
-        "total_results": len(results),
-        "articles": serializer.data
+        "total_results": total.value if total else None,
+        "total_relation": total.relation if total else None,  # 'eq' 또는 'gte'(하한값)
+        "articles": serializer.data,
+        "next_cursor": next_cursor,
     })
 
 
-def decompose_hangul(char):
-    """한글 문자를 자모로 분해"""
-    if not ('가' <= char <= '힣'):
-        return char
-    
-    code = ord(char) - ord('가')
-    jong = code % 28
-    jung = (code - jong) // 28 % 21
-    cho = (code - jong - jung * 28) // 21 // 28
-    
-    cho_list = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-    jung_list = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅘ', 'ㅙ', 'ㅚ', 'ㅛ', 'ㅜ', 'ㅝ', 'ㅞ', 'ㅟ', 'ㅠ', 'ㅡ', 'ㅢ', 'ㅣ']
-    jong_list = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
-    
-    return cho_list[cho] + jung_list[jung] + jong_list[jong]
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def hybrid_search_view(request):
+    """BM25 + 벡터(kNN) 하이브리드 검색 (reciprocal rank fusion)"""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response({"error": "검색어가 비어있습니다."}, status=400)
 
-def is_hangul_compatible(query, keyword):
-    """한글 자모 호환성 체크"""
-    if not query or not keyword:
-        return False
-    
-    # 영어나 숫자는 단순 포함 검사
-    if not any('가' <= c <= '힣' or 'ㄱ' <= c <= 'ㅣ' for c in query):
-        return query.lower() in keyword.lower()
-    
-    # 완성된 한글이 포함된 경우 단순 포함 검사
-    if all('가' <= c <= '힣' or c.isspace() or not ('ㄱ' <= c <= 'ㅣ') for c in query):
-        return query in keyword
-    
-    # 자모가 포함된 경우 세밀한 검사
-    query_jamo = ''.join(decompose_hangul(c) if '가' <= c <= '힣' else c for c in query)
-    keyword_jamo = ''.join(decompose_hangul(c) if '가' <= c <= '힣' else c for c in keyword)
-    
-    return query_jamo in keyword_jamo
+    filters, error = parse_search_filters(request)
+    if error:
+        return Response({"error": error}, status=400)
+
+    try:
+        size = min(max(int(request.GET.get('size', 20)), 1), 50)
+    except ValueError:
+        return Response({"error": "Invalid size"}, status=400)
+
+    try:
+        serializer = SearchHitSerializer(hybrid_search(query, size, **filters), many=True)
+    except Exception as e:
+        print(f"Hybrid search error: {e}")
+        return Response({"error": "검색 중 오류가 발생했습니다."}, status=503)
+    return Response({
+        "total_results": len(serializer.data),
+        "articles": serializer.data,
+    })
 
-def matches_partial_hangul(query, target):
-    """부분 입력된 한글과 완성된 단어의 매칭 체크"""
-    if not query or not target:
-        return False
-    
-    # 쿼리의 마지막 문자가 자모인지 확인
-    last_char = query[-1]
-    if not ('ㄱ' <= last_char <= 'ㅣ'):
-        return is_hangul_compatible(query, target)
-    
-    # 마지막 자모를 제외한 부분
-    prefix = query[:-1]
-    
-    # 타겟에서 가능한 모든 위치를 확인
-    for i in range(len(target)):
-        # prefix가 매칭되는지 확인
-        if prefix and not target[i:].startswith(prefix):
-            continue
-            
-        # 마지막 자모가 다음 문자의 시작과 매칭되는지 확인
-        next_pos = i + len(prefix)
-        if next_pos < len(target):
-            next_char = target[next_pos]
-            if '가' <= next_char <= '힣':
-                next_jamo = decompose_hangul(next_char)
-                if next_jamo.startswith(last_char):
-                    return True
-            elif next_char == last_char:
-                return True
-    
-    return False
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def autocomplete_view(request):
     query = request.GET.get('q', '').strip()
     
-    # 인기 키워드 목록 (실제 환경에서는 데이터베이스에서 가져올 수 있음)
-    popular_keywords = [
-        "AI", "인공지능", "머신러닝", "딥러닝", "ChatGPT", "OpenAI",
-        "경제", "주식", "부동산", "금리", "환율", "비트코인", "투자",
-        "정치", "대통령", "국회", "선거", "정책", "외교", "사과", "사회", "사건", "사람", "사업",
-        "기술", "IT", "스마트폰", "애플", "삼성", "구글", "메타", "가격", "가족", "가정",
-        "건강", "의료", "백신", "질병", "치료", "병원", "나라", "나이", "날씨",
-        "사회", "교육", "대학", "취업", "노동", "복지", "다음", "다른", "다양",
-        "스포츠", "축구", "야구", "올림픽", "월드컵", "라이프", "라이브", "라디오",
-        "문화", "영화", "드라마", "K-POP", "BTS", "예술", "마을", "마음", "마케팅",
-        "환경", "기후변화", "온실가스", "재생에너지", "친환경", "바다", "바이러스", "바로",
-        "자동차", "전기차", "테슬라", "현대", "기아", "서울", "서비스", "선택",
-        "게임", "e스포츠", "넷플릭스", "유튜브", "메타버스", "아이", "아시아", "안전"
-    ]
-
-    # 빈 쿼리일 때 인기 검색어 반환
+    # 빈 쿼리일 때 트렌딩 키워드 반환 (집계 결과가 없으면 기본 인기 키워드)
     if not query:
-        trending_keywords = [
-            "AI", "인공지능", "경제", "정치", "기술", "건강", "스포츠", "문화", 
-            "환경", "자동차", "게임", "교육", "취업", "투자", "부동산"
-        ]
+        try:
+            trending_keywords = [keyword for keyword, _ in get_trending_keywords()]
+        except Exception as e:
+            print(f"Trending keywords error: {e}")
+            trending_keywords = []
         suggestions = [
             {"text": keyword, "type": "trending"} 
-            for keyword in trending_keywords[:10]
+            for keyword in (trending_keywords or POPULAR_KEYWORDS)[:10]
         ]
         return Response({"suggestions": suggestions})
 
-    suggestions = []
-    seen_keywords = set()
-
     try:
-        # 1. 인기 키워드에서 한글 자모 매칭
-        for keyword in popular_keywords:
-            if (matches_partial_hangul(query, keyword) and 
-                keyword not in seen_keywords and 
-                len(suggestions) < 10):
-                suggestions.append({
-                    "text": keyword,
-                    "type": "keyword"
-                })
-                seen_keywords.add(keyword)
-
-        # 2. 데이터베이스에서 keywords 필드에서 매칭되는 키워드 찾기
-        if len(suggestions) < 10:
-            articles_with_keywords = NewsArticle.objects.exclude(
-                keywords__isnull=True
-            ).exclude(keywords='')[:50]
-            
-            for article in articles_with_keywords:
-                if article.keywords and len(suggestions) < 10:
-                    # keywords 필드를 파싱하여 개별 키워드 추출
-                    cleaned = article.keywords.replace('{', '').replace('}', '').replace('"', '')
-                    keywords = [k.strip() for k in cleaned.split(',') if k.strip()]
-                    
-                    for keyword in keywords:
-                        if (matches_partial_hangul(query, keyword) and 
-                            keyword not in seen_keywords and 
-                            len(keyword) >= 2 and 
-                            len(suggestions) < 10):
-                            suggestions.append({
-                                "text": keyword,
-                                "type": "keyword"
-                            })
-                            seen_keywords.add(keyword)
-
-        # 3. 제목에서 키워드 추출하기
-        if len(suggestions) < 8:
-            title_articles = NewsArticle.objects.all()[:30]
-            
-            for article in title_articles:
-                if len(suggestions) >= 10:
-                    break
-                    
-                if article.title:
-                    # 제목에서 단어 추출 (간단한 토큰화)
-                    words = article.title.split()
-                    for word in words:
-                        # 특수문자 제거 및 길이 체크
-                        clean_word = ''.join(c for c in word if c.isalnum() or c in '가-힣')
-                        if (matches_partial_hangul(query, clean_word) and 
-                            clean_word not in seen_keywords and 
-                            len(clean_word) >= 2 and 
-                            len(suggestions) < 10):
-                            suggestions.append({
-                                "text": clean_word,
-                                "type": "keyword"
-                            })
-                            seen_keywords.add(clean_word)
-
-        return Response({"suggestions": suggestions[:10]})
+        # 자모 단위로 색인한 completion suggester 한 번으로 조회 (실패 시 prefix 트리)
+        suggestions = [
+            {"text": keyword, "type": "keyword"}
+            for keyword in complete(query, 10)
+        ]
+        return Response({"suggestions": suggestions})
         
     except Exception as e:
         # 오류 시 인기 키워드에서만 검색
         print(f"Autocomplete error: {e}")
         
         suggestions = []
-        for keyword in popular_keywords:
+        for keyword in POPULAR_KEYWORDS:
             if matches_partial_hangul(query, keyword) and len(suggestions) < 10:
                 suggestions.append({
                     "text": keyword,
@@ -661,3 +745,33 @@ def autocomplete_view(request):
                 })
         
         return Response({"suggestions": suggestions})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def trending_keywords_view(request):
+    """실시간 트렌딩 키워드 (캐시된 집계 결과)"""
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        return Response({"error": "limit must be an integer."}, status=400)
+
+    try:
+        trending = get_trending_keywords()
+    except Exception as e:
+        print(f"Trending keywords error: {e}")
+        return Response({"error": "Failed to load trending keywords."}, status=500)
+
+    keywords = [
+        {"text": keyword, "score": score}
+        for keyword, score in trending[:max(limit, 0)]
+    ]
+    return Response({"keywords": keywords})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def chatbot_cache_stats(request):
+    """챗봇 응답 캐시 적중률 (요청을 처리한 워커 프로세스 하나의 값, 프로세스 간 합산 아님)"""
+    from .response_cache import response_cache
+    return Response(response_cache.stats())